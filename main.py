@@ -1,13 +1,59 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from rag_agent.agent import generate_review  # returns Dict
+load_dotenv()  # before app imports: several modules read settings at import time
+
+from utils.llm import build_llm
+from rag_agent.retrievers.base import close_shared_session, open_shared_session
+from rag_agent.agent import generate_review, generate_review_stream  # Dict / async iterator of Dicts
 
-load_dotenv()
 app = FastAPI(title="RAG Literature Review API")
 
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", str(min(32, os.cpu_count() or 1))))
+
+try:  # libuv-based loop: cheaper scheduling for the many concurrent retriever requests
+    import uvloop  # noqa: F401
+
+    EVENT_LOOP = "uvloop"
+except ImportError:  # not available on Windows
+    EVENT_LOOP = "asyncio"
+
+
+@app.on_event("startup")
+async def _bound_worker_threads() -> None:
+    """Cap both anyio's threadpool and the loop executor behind asyncio.to_thread."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = WORKER_THREADS
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=WORKER_THREADS))
+
+
+@app.on_event("startup")
+async def _prewarm_llm() -> None:
+    """Create the shared chat client (and load the local model) before the first request."""
+    try:
+        await asyncio.to_thread(build_llm)
+    except Exception:
+        pass  # no backend reachable yet; the first request will retry
+
+
+@app.on_event("startup")
+async def _open_http_session() -> None:
+    """One aiohttp session (connection pool + cache database) for all requests."""
+    await open_shared_session()
+
+
+@app.on_event("shutdown")
+async def _close_http_session() -> None:
+    await close_shared_session()
+
 
 class ReviewRequest(BaseModel):
     topic: str
@@ -22,10 +68,10 @@ class ReviewRequest(BaseModel):
 
 
 @app.post("/literature-review")
-def literature_review(req: ReviewRequest):
+async def literature_review(req: ReviewRequest):
     if not req.topic.strip():
         raise HTTPException(400, "Topic must not be empty")
-    out = generate_review(
+    out = await generate_review(
         topic=req.topic,
         citation_format=(req.citation_format or "raw").lower(),
         language=req.language or "English",
@@ -33,5 +79,22 @@ def literature_review(req: ReviewRequest):
     return out
 
 
+@app.post("/literature-review/stream")
+async def literature_review_stream(req: ReviewRequest):
+    if not req.topic.strip():
+        raise HTTPException(400, "Topic must not be empty")
+    events = generate_review_stream(
+        topic=req.topic,
+        citation_format=(req.citation_format or "raw").lower(),
+        language=req.language or "English",
+    )
+
+    async def ndjson():
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=7001)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=7001, loop=EVENT_LOOP)
\ No newline at end of file
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+import asyncio
+import os
 import re
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+import aiohttp
+import numpy as np
+import orjson
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.vectorstores import FAISS
 from pydantic.v1 import BaseModel, Field
 
 from rag_agent.retrievers import CrossrefRetriever, ScopusRetriever, WosRetriever
+from rag_agent.retrievers.base import client_session, shared_session
 from utils.citations import CitationFormatter
+from utils.embed_cache import EMBED_MODEL, embed_query, get_or_compute
 from utils.search_terms import generate_search_terms
+from utils.semantic_cache import default_cache as _semantic_cache, is_cacheable
 from utils.llm import build_llm, with_structured_output
+from utils.vector_index import (
+    POOL_MIN_RECORDS, corpus_key, gpu_available, index_path, process_pool, top_k_indices,
+)
+
+
+_PAREN_RE = re.compile(r"\(([^)]+)\)")
+_TRAIL_STRIP = ".,;: \t\n\r\f\v"  # trailing punctuation/whitespace on citation tokens
 
 
 # ── Pydantic Models for Structured Output ───────────────────────────────────
@@ -32,23 +46,45 @@ class LiteratureDraft(BaseModel):
 
 # ── Helpers ─────────────────────────────────────────────────────────────────
 
-def _dedupe_citekeys(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Ensure citekeys are unique across merged sources by adding a, b, c..."""
-    buckets: Dict[str, List[Dict[str, Any]]] = {}
+def _merge_dedupe_index(records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """One pass over merged sources that
+    - drops duplicates by DOI (or title when no DOI),
+    - makes citekeys unique by adding a, b, c... to every member of a clash,
+    - builds the citekey → record lookup.
+    """
+    out: List[Dict[str, Any]] = []
+    by_ck: Dict[str, Dict[str, Any]] = {}
+    seen_keys: set = set()
+    ck_counts: Dict[str, int] = {}
+    first_pos: Dict[str, int] = {}
+
     for r in records:
-        ck = r.get("citekey") or "AnonNd"
-        buckets.setdefault(ck, []).append(r)
+        key = (r.get("doi") or "").lower() or (r.get("title") or "").strip().lower()
+        if key:
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
 
-    out: List[Dict[str, Any]] = []
-    for ck, group in buckets.items():
-        if len(group) == 1:
-            out.extend(group)
-        else:
-            for idx, g in enumerate(group):
-                g2 = dict(g)
-                g2["citekey"] = f"{ck}{chr(ord('a') + idx)}"
-                out.append(g2)
-    return out
+        ck = r.get("citekey") or "AnonNd"
+        n = ck_counts.get(ck, 0)
+        ck_counts[ck] = n + 1
+        if n == 0:
+            first_pos[ck] = len(out)
+            by_ck[ck] = r
+            out.append(r)
+            continue
+        if n == 1:
+            # second holder of this key: retro-suffix the first one with "a"
+            first = dict(by_ck.pop(ck))
+            first["citekey"] = f"{ck}a"
+            out[first_pos[ck]] = first
+            by_ck[first["citekey"]] = first
+        r2 = dict(r)
+        r2["citekey"] = f"{ck}{chr(ord('a') + n)}"
+        by_ck[r2["citekey"]] = r2
+        out.append(r2)
+
+    return out, by_ck
 
 
 def _normalize_for_vector_text(r: Dict[str, Any]) -> str:
@@ -58,78 +94,106 @@ def _normalize_for_vector_text(r: Dict[str, Any]) -> str:
     return f"{title}\n{venue}\n\n{abstract}".strip()
 
 
-def _select_top_records(topic: str, records: List[Dict[str, Any]], k: int = 12) -> List[Dict[str, Any]]:
-    """Embed with OpenAI and pick top-k by vector similarity using FAISS."""
+async def _select_top_records(
+    query_vec: np.ndarray, records: List[Dict[str, Any]], k: int = 12, use_gpu: bool = False
+) -> List[Dict[str, Any]]:
+    """Embed records (through the on-disk cache) and pick top-k by cosine similarity.
+
+    Embedding stays in a thread (network-bound). The FAISS build + search is
+    CPU-bound and runs in a thread. Live requests retrieve a few hundred
+    records at most, so they always stay on that path. Only bulk or offline
+    corpora of `POOL_MIN_RECORDS` or more go to the process pool.
+    Indexes are persisted per corpus (least recently used pruned beyond
+    `FAISS_INDEX_MAX_FILES`) and memory-mapped when seen again.
+    With `use_gpu` (and a GPU present) the search runs on the GPU from a
+    thread instead, sharing one set of GPU resources.
+    """
     texts = [_normalize_for_vector_text(r) for r in records]
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    store = FAISS.from_texts(texts=texts, embedding=embeddings, metadatas=records)
-    sims = store.similarity_search(topic, k=k)
-    return [d.metadata for d in sims]
+    path = index_path(corpus_key(texts))
+    # a persisted index for this exact corpus makes the record embeddings unnecessary
+    xb = None
+    if not os.path.exists(path):
+        xb = await asyncio.to_thread(get_or_compute, texts, EMBED_MODEL)
+
+    async def search(xb: Optional[np.ndarray]) -> List[int]:
+        if use_gpu and gpu_available():
+            return await asyncio.to_thread(top_k_indices, xb, query_vec, k, path, True)
+        if len(records) >= POOL_MIN_RECORDS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(process_pool(), top_k_indices, xb, query_vec, k, path)
+        return await asyncio.to_thread(top_k_indices, xb, query_vec, k, path)
+
+    try:
+        idx = await search(xb)
+    except FileNotFoundError:  # the index was pruned after the existence check
+        idx = await search(await asyncio.to_thread(get_or_compute, texts, EMBED_MODEL))
+    return [records[i] for i in idx]
+
+
+_KEEP = (
+    "title", "doi", "abstract", "year", "citekey", "authors",
+    "venue", "publisher", "volume", "issue", "pages", "source"
+)
 
 
 def _records_minimal_json(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    keep = (
-        "title", "doi", "abstract", "year", "citekey", "authors",
-        "venue", "publisher", "volume", "issue", "pages", "source"
-    )
-    return [{k: r.get(k) for k in keep} for r in records]
-
-
-def _gather_citekeys_from_text(sections: List[LiteratureSection]) -> List[str]:
-    """Find (Smith2020) or (Smith2020a; Lee2022) patterns."""
-    citekeys: List[str] = []
-    patt = re.compile(r"\(([^)]+)\)")
-    for sec in sections:
-        for match in patt.finditer(sec.body or ""):
-            inside = match.group(1)
-            for token in [t.strip() for t in inside.split(";")]:
-                if re.match(r"^[A-Za-z][A-Za-z]+[0-9]{3,4}[a-z]?$", token):
-                    citekeys.append(token)
-    seen, uniq = set(), []
-    for ck in citekeys:
-        if ck not in seen:
-            uniq.append(ck)
-            seen.add(ck)
-    return uniq
-
-
-def _paren_to_bracket_citations(text: str, doi_map: Dict[str, str]) -> str:
+    # bind to locals: avoids LOAD_GLOBAL / attribute lookups in the inner loop
+    _get = dict.get
+    keep = _KEEP
+    return [{k: _get(r, k) for k in keep} for r in records]
+
+
+def _bracket_tokens(m: re.Match) -> str:
+    tokens = (t.strip().rstrip(_TRAIL_STRIP) for t in m.group(1).split(";"))
+    return " ".join(f"[{t}]" for t in tokens if t)
+
+
+def _paren_to_bracket_citations(
+    text: str, doi_map: Dict[str, str], cited: Optional[Dict[str, None]] = None
+) -> str:
     """
     Replace parentheses citations with bracket style:
       "(Smith2020; Lee2021a)" → "[Smith2020][DOI1] [Lee2021a][DOI2]"
     If DOI missing → just "[Smith2020]".
+    Tokens are also recorded in `cited` (in order of first use) when given,
+    so callers get the citekeys from the same scan.
     """
-    patt = re.compile(r"\(([^)]+)\)")
+    if not text:
+        return ""
+    if not doi_map and cited is None:
+        return _PAREN_RE.sub(_bracket_tokens, text)
+
+    _get = doi_map.get
 
     def repl(m: re.Match) -> str:
-        tokens = [t.strip() for t in m.group(1).split(";")]
         out_tokens: List[str] = []
-        for tok in tokens:
-            tok_clean = re.sub(r"[.,;:\s]+$", "", tok)
-            if not tok_clean:
+        for tok in m.group(1).split(";"):
+            tok = tok.strip().rstrip(_TRAIL_STRIP)
+            if not tok:
                 continue
-            doi = doi_map.get(tok_clean)
-            if doi:
-                out_tokens.append(f"[{tok_clean}][{doi}]")
-            else:
-                out_tokens.append(f"[{tok_clean}]")
+            if cited is not None:
+                cited[tok] = None
+            doi = _get(tok)
+            out_tokens.append(f"[{tok}][{doi}]" if doi else f"[{tok}]")
         return " ".join(out_tokens)
 
-    return patt.sub(repl, text or "")
+    return _PAREN_RE.sub(repl, text)
 
 
-def _draft_to_result_text(draft: LiteratureDraft, doi_map: Dict[str, str]) -> str:
+def _draft_to_result_text(
+    draft: LiteratureDraft, doi_map: Dict[str, str], cited: Optional[Dict[str, None]] = None
+) -> str:
     blocks: List[str] = []
     if draft.summary:
-        blocks.append(_paren_to_bracket_citations(draft.summary, doi_map))
+        blocks.append(_paren_to_bracket_citations(draft.summary, doi_map, cited))
     for s in draft.sections or []:
-        body = _paren_to_bracket_citations(s.body, doi_map)
+        body = _paren_to_bracket_citations(s.body, doi_map, cited)
         if s.heading:
             blocks.append(f"**{s.heading}**\n\n{body}")
         else:
             blocks.append(body)
     if draft.limitations:
-        blocks.append(_paren_to_bracket_citations(draft.limitations, doi_map))
+        blocks.append(_paren_to_bracket_citations(draft.limitations, doi_map, cited))
     return "\n\n".join([b for b in blocks if (b or "").strip()])
 
 
@@ -144,7 +208,7 @@ SYSTEM_PROMPT = """You are an expert academic writer.
 Return ONLY a valid JSON object matching the LiteratureDraft schema:
 - title: string
 - summary: string (150–250 words)
-- sections: array of {heading, body}
+- sections: array of {{heading, body}}
 - limitations: string
 - references: array of citekeys used in text
 
@@ -155,131 +219,272 @@ Rules:
 - Do not invent sources or citekeys not in the records.
 """
 
-HUMAN_PROMPT = """Topic: {topic}
-Output language: {language}
+# static text first, per-request values last: keeps the prompt prefix identical
+# across calls so provider-side prompt caching can reuse it
+HUMAN_PROMPT = """Write a literature review (~800–1200 words) with subheadings derived from the material.
+Return a JSON object conforming to LiteratureDraft. No extra commentary.
 
 You are given normalized records (JSON):
 {records_json}
 
-Write a literature review (~800–1200 words) with subheadings derived from the material.
-Return a JSON object conforming to LiteratureDraft. No extra commentary.
+Topic: {topic}
+Output language: {language}
 """
 
 
-# ── Public API (returns dict) ───────────────────────────────────────────────
+# ── Retrievers (module scope: connection pools survive across requests) ────
 
-def _retrieve_all(topic: str, language: str, k_each: int = 50) -> List[Dict[str, Any]]:
-    """Robust retrieval with search-term generation fallback."""
-    cr = CrossrefRetriever()
-    sc = None
-    wos = None
+def _optional_retriever(cls: Any) -> Any:
     try:
-        sc = ScopusRetriever()
+        return cls()
     except Exception:
-        sc = None
-    try:
-        wos = WosRetriever()
-    except Exception:
-        wos = None
+        return None
+
 
+_CR = CrossrefRetriever()
+_SC = _optional_retriever(ScopusRetriever)
+_WOS = _optional_retriever(WosRetriever)
+_RETRIEVERS: List[Any] = [r for r in (_CR, _SC, _WOS) if r is not None]
+
+
+# ── Public API (returns dict) ───────────────────────────────────────────────
+
+async def _fan_out(
+    jobs: List[Tuple[Any, str]], k_each: int, session: aiohttp.ClientSession
+) -> List[Dict[str, Any]]:
+    """Run every (retriever, query) pair concurrently; failed calls are dropped."""
+    results = await asyncio.gather(
+        *(r.afetch_metadata(q, k_each, session=session) for r, q in jobs),
+        return_exceptions=True,
+    )
     records: List[Dict[str, Any]] = []
+    for res in results:
+        if isinstance(res, BaseException):
+            continue
+        records.extend(res)
+    return records
 
-    # 1) try original topic
-    try:
-        records.extend(cr.fetch_metadata(topic, k=k_each))
-    except Exception:
-        pass
-    if sc:
-        try:
-            records.extend(sc.fetch_metadata(topic, k=k_each))
-        except Exception:
-            pass
-    if wos:
-        try:
-            records.extend(wos.fetch_metadata(topic, k=k_each))
-        except Exception:
-            pass
-
-    # 2) If empty OR topic looks very long/verbose → derive compact search terms
-    if (not records) or (len(topic) > 160 or len(topic.split()) > 25):
-        try:
-            terms = generate_search_terms(topic, language, max_terms=3)
-        except Exception:
-            terms = []
-        for t in terms:
+
+async def _retrieve_all(topic: str, language: str, k_each: int = 50) -> List[Dict[str, Any]]:
+    """Robust retrieval with search-term generation fallback."""
+    retrievers = _RETRIEVERS
+
+    # one HTTP session for every retriever and round: the server's long-lived
+    # one when open (connections outlive the request), else a per-call one
+    async with client_session(shared_session()) as session:
+        # 1) try original topic on all sources at once
+        records = await _fan_out([(r, topic) for r in retrievers], k_each, session)
+
+        # 2) If empty OR topic looks very long/verbose → derive compact search terms
+        if (not records) or (len(topic) > 160 or len(topic.split()) > 25):
             try:
-                records.extend(cr.fetch_metadata(t, k=k_each))
+                terms = await asyncio.to_thread(generate_search_terms, topic, language, 3)
             except Exception:
-                pass
-            if sc:
-                try:
-                    records.extend(sc.fetch_metadata(t, k=k_each))
-                except Exception:
-                    pass
-            if wos:
-                try:
-                    records.extend(wos.fetch_metadata(t, k=k_each))
-                except Exception:
-                    pass
+                terms = []
+            # full (retriever, term) cross-product in a single gather
+            records.extend(await _fan_out([(r, t) for t in terms for r in retrievers], k_each, session))
 
     return records
 
 
-def generate_review(topic: str, citation_format: str = "raw", language: str = "English") -> Dict[str, Any]:
+def _draft_chain(stream: bool = False) -> Any:
+    """Prompt → structured-output LLM; blocking (may ping the local LLM server).
+
+    With `stream`, the output is parsed as a JSON schema instead of the Pydantic
+    class: a Pydantic parser yields nothing until the whole draft validates,
+    while the JSON parser yields growing partial dicts as the tokens arrive.
     """
-    End-to-end pipeline that returns:
-    {
-      "query": <topic>,
-      "result": <single string body with [CITEKEY][DOI] style>,
-      "resources": <List[Dict] minimal records>,
-      "citations": <List[Dict] structured metadata>,
-      "references_formatted": {"style": <style>, "entries": [str, ...]}
-    }
+    llm = build_llm()
+    prompt = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("human", HUMAN_PROMPT)])
+    return prompt | with_structured_output(llm, LiteratureDraft.schema() if stream else LiteratureDraft)
+
+
+async def _prepare(
+    topic: str,
+    citation_format: str,
+    language: str,
+    cache_threshold: Optional[float] = None,
+    cache_path: Optional[str] = None,
+    use_gpu: bool = False,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Steps shared by both entry points: cache lookup, retrieval, selection.
+
+    Returns ``{"early": <result>}`` when no LLM call is needed (cache hit or
+    nothing retrieved), otherwise the context `_finalize` and the draft chain need.
     """
-    # 1) retrieval (with fallback search terms)
-    merged = _retrieve_all(topic, language, k_each=50)
+    # 0) semantic cache – the topic vector is reused for record selection below
+    query_vec = await asyncio.to_thread(embed_query, topic, EMBED_MODEL)
+    # a hit skips retrieval, embeddings and the LLM entirely; time-sensitive
+    # topics ("latest", "today", …) bypass the cache in both directions
+    cache = _semantic_cache(cache_path)
+    cache_ns = f"{language.lower()}|{citation_format}" if is_cacheable(topic) else None
+    hit = cache.lookup(query_vec, namespace=cache_ns, threshold=cache_threshold) if cache_ns else None
+    if hit is not None:
+        return {"early": {**hit, "query": topic, "cache": "hit"}}
+
+    # the drafting chain (local LLM ping / client setup) is built in a thread
+    # while retrieval and record selection run
+    chain_task = asyncio.create_task(asyncio.to_thread(_draft_chain, stream))
+    # mark a failure as retrieved even when an early exit never awaits the task
+    chain_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        # 1) retrieval (with fallback search terms)
+        merged = await _retrieve_all(topic, language, k_each=50)
+
+        if not merged:
+            return {"early": {
+                "query": topic,
+                "result": "No records were retrieved from Crossref/Scopus/WoS for this query.",
+                "resources": [],
+                "citations": [],
+                "references_formatted": {"style": citation_format, "entries": []},
+            }}
+
+        # 2) de-duplication and selection
+        merged, by_ck = _merge_dedupe_index(merged)
+        top_records = await _select_top_records(query_vec, merged, k=12, use_gpu=use_gpu)
+        records_min = _records_minimal_json(top_records)
+
+        # 3) LLM drafting with structured output (local → OpenAI fallback)
+        chain = await chain_task
+    finally:
+        chain_task.cancel()  # no-op once awaited; drops it on early exits and errors
 
-    if not merged:
-        return {
-            "query": topic,
-            "result": "No records were retrieved from Crossref/Scopus/WoS for this query.",
-            "resources": [],
-            "citations": [],
-            "references_formatted": {"style": citation_format, "entries": []},
-        }
+    return {
+        "query_vec": query_vec,
+        "cache": cache,
+        "cache_ns": cache_ns,
+        "by_ck": by_ck,
+        "chain": chain,
+        # serialise once: compact JSON (the template would otherwise interpolate a Python repr)
+        "inputs": {
+            "topic": topic,
+            "language": language,
+            "records_json": orjson.dumps(records_min, option=orjson.OPT_NON_STR_KEYS).decode(),
+        },
+    }
 
-    # 2) de-duplication and selection
-    merged = _dedupe_citekeys(merged)
-    top_records = _select_top_records(topic, merged, k=12)
-    records_min = _records_minimal_json(top_records)
 
-    # 3) LLM drafting with structured output (local → OpenAI fallback)
-    llm = build_llm()
-    draft_llm = with_structured_output(llm, LiteratureDraft)
-    prompt = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("human", HUMAN_PROMPT)])
-    draft: LiteratureDraft = (prompt | draft_llm).invoke(
-        {"topic": topic, "language": language, "records_json": records_min}
-    )
+async def _finalize(topic: str, citation_format: str, draft: LiteratureDraft, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    by_ck = ctx["by_ck"]
 
-    # 4) Map citekeys -> DOI and select actually cited resources
-    citekeys = draft.references or _gather_citekeys_from_text(draft.sections)
-    by_ck: Dict[str, Dict[str, Any]] = {r["citekey"]: r for r in merged}
+    # 4+5) One scan over the draft both rewrites (CITEKEY) → [CITEKEY][DOI]
+    #    and collects the cited keys; the text is authoritative, the model's
+    #    own reference list is only a fallback
+    doi_map = {ck: r["doi"] for ck, r in by_ck.items() if r.get("doi")}
+    cited: Dict[str, None] = {}
+    result_text = _draft_to_result_text(draft, doi_map, cited)
+    citekeys = [ck for ck in cited if ck in by_ck] or draft.references
     selected_records = [by_ck[ck] for ck in citekeys if ck in by_ck]
-    doi_map = {r["citekey"]: r["doi"] for r in selected_records if r.get("doi")}
-
-    # 5) Build result text with bracket citations
-    result_text = _draft_to_result_text(draft, doi_map)
 
     # 6) Render citations (structured + optionally formatted strings)
+    #    (parse once, then build both views concurrently)
     formatter = CitationFormatter()
-    citations_struct = formatter.to_structured(selected_records)
-    citations_formatted = formatter.format(selected_records, style=citation_format)
+    parsed = formatter.parse_all(selected_records)
+    citations_struct, citations_formatted = await asyncio.gather(
+        asyncio.to_thread(formatter.to_structured_parsed, parsed),
+        asyncio.to_thread(formatter.format_parsed, parsed, citation_format),
+    )
 
     # 7) API object
-    return {
+    out = {
         "query": topic,
         "result": result_text,
         "resources": _records_minimal_json(selected_records),
         "citations": citations_struct,
         "references_formatted": {"style": citation_format, "entries": citations_formatted},
-    }
\ No newline at end of file
+    }
+    if ctx["cache_ns"]:
+        await asyncio.to_thread(ctx["cache"].store, ctx["query_vec"], out, ctx["cache_ns"])
+    return out
+
+
+async def generate_review(
+    topic: str,
+    citation_format: str = "raw",
+    language: str = "English",
+    cache_threshold: Optional[float] = None,
+    cache_path: Optional[str] = None,
+    use_gpu: bool = False,
+) -> Dict[str, Any]:
+    """
+    End-to-end pipeline that returns:
+    {
+      "query": <topic>,
+      "result": <single string body with [CITEKEY][DOI] style>,
+      "resources": <List[Dict] minimal records>,
+      "citations": <List[Dict] structured metadata>,
+      "references_formatted": {"style": <style>, "entries": [str, ...]}
+    }
+    Near-paraphrases of an earlier topic (same language/style) are served from
+    the semantic cache and carry an extra ``"cache": "hit"`` key.
+    `cache_threshold` overrides the cosine similarity a hit needs and
+    `cache_path` selects another cache file (defaults: SEMANTIC_CACHE_*).
+    `use_gpu` moves the FAISS record search to a GPU when FAISS can see one.
+    """
+    ctx = await _prepare(topic, citation_format, language, cache_threshold, cache_path, use_gpu)
+    if "early" in ctx:
+        return ctx["early"]
+
+    draft: LiteratureDraft = await ctx["chain"].ainvoke(ctx["inputs"])
+    return await _finalize(topic, citation_format, draft, ctx)
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+    if obj is None:
+        return {}
+    return obj if isinstance(obj, dict) else obj.dict()
+
+
+async def generate_review_stream(
+    topic: str,
+    citation_format: str = "raw",
+    language: str = "English",
+    cache_threshold: Optional[float] = None,
+    cache_path: Optional[str] = None,
+    use_gpu: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming variant of `generate_review`.
+
+    Yields ``{"event": "section", "index", "heading", "body"}`` frames as soon
+    as each drafted section is complete (bracket citations already applied),
+    then one ``{"event": "done", ...}`` frame carrying the full result dict.
+    """
+    ctx = await _prepare(topic, citation_format, language, cache_threshold, cache_path, use_gpu, stream=True)
+    if "early" in ctx:
+        yield {"event": "done", **ctx["early"]}
+        return
+
+    doi_all = {ck: r["doi"] for ck, r in ctx["by_ck"].items() if r.get("doi")}
+
+    def section_event(idx: int, sec: Any) -> Dict[str, Any]:
+        sec = _as_dict(sec)
+        return {
+            "event": "section",
+            "index": idx,
+            "heading": sec.get("heading") or "",
+            "body": _paren_to_bracket_citations(sec.get("body") or "", doi_all),
+        }
+
+    last: Any = None
+    emitted = 0
+    async for chunk in ctx["chain"].astream(ctx["inputs"]):
+        last = chunk
+        partial = _as_dict(chunk)
+        sections = partial.get("sections") or []
+        # a section is final once the model has started the next one, or has
+        # moved on to the fields after `sections`
+        closed = len(sections) if "limitations" in partial or "references" in partial else len(sections) - 1
+        while emitted < closed:
+            yield section_event(emitted, sections[emitted])
+            emitted += 1
+
+    if last is None:
+        raise RuntimeError("The LLM returned no draft.")
+    draft = last if isinstance(last, LiteratureDraft) else LiteratureDraft.parse_obj(_as_dict(last))
+    for idx in range(emitted, len(draft.sections)):
+        yield section_event(idx, draft.sections[idx])
+
+    out = await _finalize(topic, citation_format, draft, ctx)
+    yield {"event": "done", **out}
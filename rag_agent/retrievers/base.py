@@ -1,14 +1,228 @@
+import asyncio
+import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Mapping, Optional, Tuple
+
+import aiohttp
+import aiohttp_client_cache
+from aiohttp_client_cache.response import CachedResponse
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 10  # keep-alive connections per host
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30)
+# transport-level retries for retrievers with `http_retries = True`: connection
+# errors and 429/5xx, exponential backoff, Retry-After honoured
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,  # hand the last response to raise_for_status()
+)
+
+
+def status_headers(exc: Optional[BaseException]) -> Tuple[Optional[int], Mapping[str, str]]:
+    """HTTP status and response headers carried by a requests/aiohttp error."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code, exc.response.headers
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status, exc.headers or {}
+    return None, {}
+
+
+def retryable(exc: BaseException) -> bool:
+    """Same triggers as `HTTP_RETRY`: transport failures and 429/5xx responses."""
+    status, _ = status_headers(exc)
+    if status is None:  # transport failure
+        return isinstance(
+            exc, (requests.ConnectionError, requests.Timeout, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        )
+    return status in HTTP_RETRY.status_forcelist
+
+
+_JITTER = wait_random_exponential(multiplier=1, max=30)
+
+
+def retry_wait(state: RetryCallState) -> float:
+    """Server's `Retry-After` (seconds form, capped at 60) when given, else full-jitter backoff."""
+    _, headers = status_headers(state.outcome.exception())
+    try:
+        return min(float(headers.get("Retry-After")), 60.0)
+    except (TypeError, ValueError):
+        return _JITTER(state)
+
+
+# the aiohttp counterpart of HTTP_RETRY (same triggers and attempts); jitter keeps
+# parallel requests from retrying in lockstep
+HTTP_ARETRY = retry(
+    retry=retry_if_exception(retryable),
+    wait=retry_wait,
+    stop=stop_after_attempt(HTTP_RETRY.total + 1),
+    reraise=True,
+)
+
+# on-disk cache of GET responses for retrievers with `http_cache = True`;
+# HTTP_CACHE_TTL=0 turns it off
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(".cache", "http"))
+HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", "86400"))  # seconds
+# credentials: left out of cache keys, and redacted from the request stored with
+# each cached response (requests_cache does this itself for `ignored_parameters`,
+# the async backend below strips the headers before saving)
+_SECRET_PARAMS = ("X-ELS-APIKey", "X-ELS-Insttoken", "X-ApiKey", "Authorization")
+_SECRET_HEADERS = frozenset(p.lower().encode() for p in _SECRET_PARAMS)
+
+
+def _redact(cached: CachedResponse) -> CachedResponse:
+    cached.request_raw_headers = tuple(
+        (k, v) for k, v in cached.request_raw_headers if k.lower() not in _SECRET_HEADERS
+    )
+    cached.history = tuple(_redact(r) for r in cached.history)
+    return cached
+
+
+class _RedactingSQLiteBackend(aiohttp_client_cache.SQLiteBackend):
+    """SQLite response cache that never writes credential headers to disk.
+
+    aiohttp_client_cache keeps every request header with the cached response,
+    and `ignored_params` only affects cache keys.
+    """
+
+    async def save_response(
+        self, response: aiohttp.ClientResponse, cache_key: Optional[str] = None, expires: Optional[datetime] = None
+    ) -> None:
+        cache_key = cache_key or self.create_key(response.method, response.url)
+        cached = await CachedResponse.from_client_response(response, expires)
+        await self.responses.write(cache_key, _redact(cached))
+        # alias redirects to the same entry, as the base implementation does
+        for r in response.history:
+            await self.redirects.write(self.create_key(r.method, r.url), cache_key)
+
+
+def _new_session() -> aiohttp.ClientSession:
+    """`ClientSession` backed by the on-disk HTTP cache unless `HTTP_CACHE_TTL` is 0."""
+    if HTTP_CACHE_TTL <= 0:
+        return aiohttp.ClientSession(timeout=HTTP_TIMEOUT)
+    cache = _RedactingSQLiteBackend(
+        cache_name=f"{HTTP_CACHE_PATH}-async.sqlite",
+        expire_after=HTTP_CACHE_TTL,
+        allowed_methods=("GET",),
+        ignored_params=_SECRET_PARAMS,
+    )
+    return aiohttp_client_cache.CachedSession(cache=cache, timeout=HTTP_TIMEOUT)
+
+
+@asynccontextmanager
+async def client_session(session: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """Use the caller's session, or open a short-lived one for a one-off call."""
+    if session is not None:
+        yield session
+        return
+    async with _new_session() as own:
+        yield own
+
+
+_SHARED: Optional[aiohttp.ClientSession] = None
+_SHARED_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def open_shared_session() -> None:
+    """Open the long-lived session for servers (call on startup and pair with
+    `close_shared_session` on shutdown): its keep-alive connections and cache
+    database are then reused by every request on this event loop."""
+    global _SHARED, _SHARED_LOOP
+    if _SHARED is None or _SHARED.closed:
+        _SHARED, _SHARED_LOOP = _new_session(), asyncio.get_running_loop()
+
+
+def shared_session() -> Optional[aiohttp.ClientSession]:
+    """The session opened by `open_shared_session`, if it belongs to the running
+    loop; None otherwise (scripts, `asyncio.run`), so callers fall back to a
+    short-lived `client_session()` that is closed with its block."""
+    if _SHARED is None or _SHARED.closed or _SHARED_LOOP is not asyncio.get_running_loop():
+        return None
+    return _SHARED
+
+
+async def close_shared_session() -> None:
+    global _SHARED, _SHARED_LOOP
+    session, _SHARED, _SHARED_LOOP = _SHARED, None, None
+    if session is not None and not session.closed:
+        await session.close()
+
 
 class BaseRetriever(ABC):
-    """Abstract base class for all retrievers."""
+    """Abstract base class for all retrievers.
+
+    Each instance owns a pooled `requests.Session`, so keep instances around
+    (e.g. at module scope) to reuse TCP/TLS connections across queries.
+    Subclasses that set `http_cache = True` get a `requests_cache.CachedSession`
+    instead, so repeated queries are answered from SQLite, and those that set
+    `http_retries = True` let the connection pool retry transient failures
+    (`HTTP_RETRY`; async requests use the matching `HTTP_ARETRY` decorator).
+    """
+
+    http_cache = False
+    http_retries = False
+
+    def __init__(self) -> None:
+        self._session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        if self.http_cache and HTTP_CACHE_TTL > 0:
+            session = requests_cache.CachedSession(
+                f"{HTTP_CACHE_PATH}.sqlite",
+                backend="sqlite",
+                expire_after=HTTP_CACHE_TTL,
+                allowable_methods=("GET",),
+                ignored_parameters=_SECRET_PARAMS,
+            )
+        else:
+            session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            max_retries=HTTP_RETRY if self.http_retries else 0,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(self, url: str, refresh: bool = False, **kwargs: Any) -> requests.Response:
+        """GET through the pooled session; `refresh=True` bypasses a cached response."""
+        if refresh and isinstance(self._session, requests_cache.CachedSession):
+            kwargs["force_refresh"] = True
+        return self._session.get(url, **kwargs)
+
+    def _aget(self, session: aiohttp.ClientSession, url: str, refresh: bool = False, **kwargs: Any):
+        """`session.get` that skips the cache (read and write) when `refresh=True`
+        or for retrievers without `http_cache`, even on a shared cached session."""
+        if (refresh or not self.http_cache) and isinstance(session, aiohttp_client_cache.CachedSession):
+            kwargs["expire_after"] = 0  # DO_NOT_CACHE
+        return session.get(url, **kwargs)
 
     @abstractmethod
     def fetch_metadata(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
         """Query the remote index and return list of metadata dictionaries."""
         raise NotImplementedError
 
+    async def afetch_metadata(
+        self, query: str, k: int = 20, session: Optional[aiohttp.ClientSession] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of `fetch_metadata`.
+
+        Pass one `aiohttp.ClientSession` to all retrievers to share its
+        connection pool. The default runs the blocking implementation in a
+        worker thread; retrievers with a native async client override this.
+        """
+        return await asyncio.to_thread(self.fetch_metadata, query, k)
+
     def _clean_text(self, text: str) -> str:
         """Utility to normalise whitespace."""
         return " ".join(text.split())
@@ -1,13 +1,25 @@
+import asyncio
 import os
-import requests
 import html
 import re
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup, FeatureNotFound
-from tenacity import retry, wait_exponential, stop_after_attempt
-from .base import BaseRetriever
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+import aiohttp
+import orjson
+import lxml.html
+from lxml import etree
+from .base import BaseRetriever, HTTP_ARETRY, HTTP_TIMEOUT, client_session
 
 CROSSREF_API = "https://api.crossref.org/works"
+MAX_RESULTS = 2000  # per query
+PAGE_SIZE = 100  # rows per request; larger k is fetched in pages
+PAGE_CONCURRENCY = 4  # pages in flight at once (async path)
+
+_NONALNUM_RE = re.compile(r"[^A-Za-z0-9 ]+")
+_WS_RE = re.compile(r"\s+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_TITLE_HEAD = 64  # title prefix scanned for the citekey word
 
 
 class CrossrefRetriever(BaseRetriever):
@@ -18,45 +30,80 @@ class CrossrefRetriever(BaseRetriever):
     - Adds `mailto` in query string AND includes it in User-Agent for polite pool.
     - Pulls additional bibliographic fields (container-title, publisher, volume, issue, page).
     - Strips JATS/HTML from abstracts; returns title if no abstract is deposited.
-    - Caps `rows` to 2000 (Crossref max). If nothing is found, retries with `query`.
+    - Fetches up to 2000 results in pages of 100 (the async variant requests the
+      remaining pages concurrently). If nothing is found, retries with `query`.
+    - Responses are cached on disk (see `HTTP_CACHE_TTL`); `refresh=True` bypasses it.
     """
 
+    http_cache = True
+    http_retries = True
+
     @staticmethod
     def _strip_html(raw: str) -> str:
         if not raw:
             return ""
-        try:
-            txt = BeautifulSoup(raw, "lxml").get_text(" ")
-        except FeatureNotFound:
-            txt = BeautifulSoup(raw, "html.parser").get_text(" ")
-        txt = html.unescape(txt)
-        return re.sub(r"\s+", " ", txt).strip()
+        if "<" not in raw:  # no markup: decoding entities is all parsing would do
+            txt = html.unescape(raw) if "&" in raw else raw
+        else:
+            try:
+                txt = " ".join(lxml.html.fromstring(raw).itertext())
+            except (ValueError, etree.ParserError):
+                txt = html.unescape(_TAG_RE.sub(" ", raw))
+        # the parse decodes one level of entities; double-escaped abstracts
+        # ("&amp;lt;") need a second pass, as html.unescape after BeautifulSoup did
+        if "&" in txt:  # most abstracts carry no entity refs
+            txt = html.unescape(txt)
+        return _WS_RE.sub(" ", txt).strip()
 
     @staticmethod
-    def _citekey(item: Dict[str, Any]) -> str:
-        year = (
-            item.get("issued", {}).get("date-parts", [[None]])[0][0]
-            or item.get("published-print", {}).get("date-parts", [[None]])[0][0]
-            or item.get("published-online", {}).get("date-parts", [[None]])[0][0]
-            or "n.d."
-        )
+    def _year(item: Dict[str, Any]) -> Optional[int]:
+        """First year found in issued → published-print → published-online."""
+        for field in ("issued", "published-print", "published-online"):
+            parts = (item.get(field) or {}).get("date-parts")
+            if parts and parts[0] and parts[0][0]:
+                return parts[0][0]
+        return None
+
+    @classmethod
+    def _citekey(cls, item: Dict[str, Any], year: Optional[int] = None) -> str:
+        year = year or cls._year(item) or "n.d."
         authors = item.get("author") or []
-        surname = authors[0].get("family", "Anon") if authors else "Anon"
-        title_words = re.sub(
-            r"[^A-Za-z0-9 ]+", " ", ((item.get("title") or [""])[0])
-        ).split()
-        first_word = next((w for w in title_words if len(w) > 2), "Work")
+        # surnames repeat across a result page; share one string object each
+        surname = sys.intern(authors[0].get("family") or "Anon") if authors else "Anon"
+        title = (item.get("title") or [""])[0]
+        # the first long-enough word is nearly always near the start
+        head = title if len(title) <= _TITLE_HEAD else title[:_TITLE_HEAD].rpartition(" ")[0]
+        first_word = cls._first_word(head) or (head != title and cls._first_word(title)) or "Work"
         return f"{surname}{year}{first_word.capitalize()}"
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-    def _request(self, params: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
-        resp = requests.get(CROSSREF_API, params=params, headers=headers, timeout=30)
+    @staticmethod
+    def _first_word(text: str) -> Optional[str]:
+        return next((w for w in _NONALNUM_RE.sub(" ", text).split() if len(w) > 2), None)
+
+    def _request(self, params: Dict[str, Any], headers: Dict[str, str], refresh: bool = False) -> Dict[str, Any]:
+        resp = self._get(CROSSREF_API, refresh, params=params, headers=headers, timeout=30)
         resp.raise_for_status()
-        return resp.json() or {}
+        return (orjson.loads(resp.content) if resp.content else None) or {}
 
-    def fetch_metadata(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
+    @HTTP_ARETRY
+    async def _arequest(
+        self,
+        session: aiohttp.ClientSession,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        async with self._aget(
+            session, CROSSREF_API, refresh, params=params, headers=headers, timeout=HTTP_TIMEOUT
+        ) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+            return (orjson.loads(body) if body else None) or {}
+
+    @staticmethod
+    def _build_request(query: str, k: int) -> Tuple[Dict[str, Any], Dict[str, str]]:
         mailto = os.getenv("CROSSREF_MAILTO", "example@example.com")
-        rows = max(1, min(int(k or 20), 2000))  # Crossref hard max
+        rows = min(k, PAGE_SIZE)
         params = {
             "query.bibliographic": query,
             "rows": rows,
@@ -67,28 +114,88 @@ class CrossrefRetriever(BaseRetriever):
         headers = {
             "User-Agent": f"rag-agent/0.3 (+mailto:{mailto})"
         }
+        return params, headers
+
+    @staticmethod
+    def _broaden(params: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """Fallback params: broad `query` instead of `query.bibliographic`."""
+        params = dict(params)
+        params.pop("query.bibliographic", None)
+        params["query"] = query
+        return params
+
+    @staticmethod
+    def _items(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return (data.get("message") or {}).get("items", [])
+
+    @staticmethod
+    def _limit(k: int) -> int:
+        return max(1, min(int(k or 20), MAX_RESULTS))
+
+    @staticmethod
+    def _pages(params: Dict[str, Any], first: Dict[str, Any], k: int) -> List[Dict[str, Any]]:
+        """Params of the pages after `first`, up to `k` results or the hit count."""
+        rows = params["rows"]
+        total = min(k, (first.get("message") or {}).get("total-results") or 0)
+        return [{**params, "offset": off, "rows": min(rows, total - off)} for off in range(rows, total, rows)]
+
+    def fetch_metadata(self, query: str, k: int = 20, refresh: bool = False) -> List[Dict[str, Any]]:
+        k = self._limit(k)
+        params, headers = self._build_request(query, k)
+        data = self._request(params, headers, refresh)
+        if not self._items(data):  # fallback to broad `query`
+            params = self._broaden(params, query)
+            data = self._request(params, headers, refresh)
 
-        data = self._request(params, headers)
-        items = (data.get("message") or {}).get("items", [])
+        items = self._items(data)
+        for page in self._pages(params, data, k):
+            more = self._items(self._request(page, headers, refresh))
+            items.extend(more)
+            if len(more) < page["rows"]:  # short page: the result set ended early
+                break
+        return self._parse_items(items[:k])
 
-        if not items:  # fallback to broad `query`
-            params.pop("query.bibliographic", None)
-            params["query"] = query
-            data = self._request(params, headers)
-            items = (data.get("message") or {}).get("items", [])
+    async def afetch_metadata(
+        self,
+        query: str,
+        k: int = 20,
+        session: Optional[aiohttp.ClientSession] = None,
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        k = self._limit(k)
+        params, headers = self._build_request(query, k)
+        async with client_session(session) as s:
+            data = await self._arequest(s, params, headers, refresh)
+            if not self._items(data):  # fallback to broad `query`
+                params = self._broaden(params, query)
+                data = await self._arequest(s, params, headers, refresh)
 
+            # the hit count is known after the first page: fetch the rest concurrently
+            gate = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+            async def page(p: Dict[str, Any]) -> List[Dict[str, Any]]:
+                async with gate:
+                    return self._items(await self._arequest(s, p, headers, refresh))
+
+            todo = self._pages(params, data, k)
+            pages = await asyncio.gather(*(page(p) for p in todo))
+
+        items = self._items(data)
+        for p, more in zip(todo, pages):
+            items.extend(more)
+            if len(more) < p["rows"]:  # short page: later offsets are past the end
+                break
+        return self._parse_items(items[:k])
+
+    def _parse_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
         for it in items:
             title = (it.get("title") or [""])[0]
             doi = it.get("DOI") or None
             abstract_raw = it.get("abstract") or title
             clean_abs = self._strip_html(abstract_raw)
-            _year = (
-                it.get("issued", {}).get("date-parts", [[None]])[0][0]
-                or it.get("published-print", {}).get("date-parts", [[None]])[0][0]
-                or it.get("published-online", {}).get("date-parts", [[None]])[0][0]
-            )
-            year = str(_year) if _year else None
+            y = self._year(it)
+            year = str(y) if y else None
             container = (it.get("container-title") or [""])
             venue = container[0] if container else ""
 
@@ -98,7 +205,7 @@ class CrossrefRetriever(BaseRetriever):
                     "doi": doi,
                     "abstract": clean_abs,
                     "year": year,
-                    "citekey": self._citekey(it),
+                    "citekey": self._citekey(it, y),
                     "authors": [
                         ("{} {}".format(a.get("given", ""), a.get("family", "")).strip())
                         for a in (it.get("author") or [])
@@ -1,10 +1,12 @@
+import asyncio
 import os
-import requests
 import html
-from typing import List, Dict, Any
-from tenacity import retry, wait_exponential, stop_after_attempt
+from typing import List, Dict, Any, Optional, Tuple
 
-from .base import BaseRetriever
+import aiohttp
+import orjson
+
+from .base import BaseRetriever, HTTP_ARETRY, HTTP_TIMEOUT, client_session
 
 SCOPUS_URL = "https://api.elsevier.com/content/search/scopus"
 
@@ -15,17 +17,37 @@ class ScopusRetriever(BaseRetriever):
     Notes:
     - Requires `ELSEVIER_API_KEY`. Optional: `ELSEVIER_INST_TOKEN`.
     - Uses TITLE-ABS-KEY() wrapper when a plain natural string is provided.
-    - Honors Scopus page size (count) defaults; paginates until `k` docs collected.
+    - Honors Scopus page size (count) defaults; paginates until `k` docs collected
+      (the async variant requests all pages at once).
     - Extracts venue/volume/issue/pages when present in COMPLETE view.
+    - Responses are cached on disk (see `HTTP_CACHE_TTL`); `refresh=True` bypasses it.
     """
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-    def _request(self, headers: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
-        resp = requests.get(SCOPUS_URL, headers=headers, params=params, timeout=30)
-        resp.raise_for_status()
-        return resp.json() or {}
+    http_cache = True
+    http_retries = True
 
-    def fetch_metadata(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
+    def _request(self, headers: Dict[str, str], params: Dict[str, Any], refresh: bool = False) -> Dict[str, Any]:
+        resp = self._get(SCOPUS_URL, refresh, headers=headers, params=params, timeout=30)
+        resp.raise_for_status()
+        return (orjson.loads(resp.content) if resp.content else None) or {}
+
+    @HTTP_ARETRY
+    async def _arequest(
+        self,
+        session: aiohttp.ClientSession,
+        headers: Dict[str, str],
+        params: Dict[str, Any],
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        async with self._aget(
+            session, SCOPUS_URL, refresh, headers=headers, params=params, timeout=HTTP_TIMEOUT
+        ) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+            return (orjson.loads(body) if body else None) or {}
+
+    @staticmethod
+    def _build_request(query: str, k: int) -> Tuple[Dict[str, str], Dict[str, Any], int]:
         api_key = os.getenv("ELSEVIER_API_KEY")
         inst_token = os.getenv("ELSEVIER_INST_TOKEN")
         if not api_key:
@@ -52,58 +74,83 @@ class ScopusRetriever(BaseRetriever):
                 "prism:publicationName,prism:volume,prism:issueIdentifier,prism:pageRange"
             ),
         }
+        return headers, params, page_size
+
+    @staticmethod
+    def _entries(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return (data.get("search-results", {}) or {}).get("entry", []) or []
+
+    def fetch_metadata(self, query: str, k: int = 20, refresh: bool = False) -> List[Dict[str, Any]]:
+        headers, params, page_size = self._build_request(query, k)
 
         results: List[Dict[str, Any]] = []
         start = 0
         while len(results) < k:
             params["start"] = start
-            data = self._request(headers, params)
-            sr = data.get("search-results", {})
-            entries = sr.get("entry", []) or []
+            entries = self._entries(self._request(headers, params, refresh))
             if not entries:
                 break
-
-            for e in entries:
-                title = e.get("dc:title")
-                doi = e.get("prism:doi")
-                abstract = e.get("dc:description") or ""
-                if abstract:
-                    abstract = html.unescape(abstract)
-
-                cover_date = e.get("prism:coverDate")  # "YYYY-MM-DD"
-                year = cover_date[:4] if cover_date and len(cover_date) >= 4 else None
-
-                creator = e.get("dc:creator")  # "Surname, Given"
-                if creator:
-                    surname = creator.split(",")[0].strip()
-                    authors = [creator]
-                else:
-                    surname = "Anon"
-                    authors = []
-
-                citekey = f"{surname}{year or 'n.d.'}"
-
-                results.append(
-                    {
-                        "title": title,
-                        "doi": doi,
-                        "abstract": abstract,
-                        "year": year,
-                        "citekey": citekey,
-                        "authors": authors,
-                        "venue": e.get("prism:publicationName"),
-                        "volume": e.get("prism:volume"),
-                        "issue": e.get("prism:issueIdentifier"),
-                        "pages": e.get("prism:pageRange"),
-                        "publisher": None,
-                        "source": "scopus",
-                    }
-                )
-
-                if len(results) >= k:
-                    break
-
+            results.extend(self._parse_entry(e) for e in entries[: k - len(results)])
             # prepare next page
             start += page_size
 
-        return results
\ No newline at end of file
+        return results
+
+    async def afetch_metadata(
+        self,
+        query: str,
+        k: int = 20,
+        session: Optional[aiohttp.ClientSession] = None,
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Fetch all `ceil(k / page_size)` pages concurrently instead of one by one."""
+        headers, params, page_size = self._build_request(query, k)
+        starts = range(0, max(1, int(k or 20)), page_size)
+        async with client_session(session) as s:
+            pages = await asyncio.gather(
+                *(self._arequest(s, headers, {**params, "start": start}, refresh) for start in starts)
+            )
+
+        results: List[Dict[str, Any]] = []
+        for data in pages:
+            entries = self._entries(data)
+            if not entries:  # past the last page of hits
+                break
+            results.extend(self._parse_entry(e) for e in entries)
+        return results[:k]
+
+    @staticmethod
+    def _parse_entry(e: Dict[str, Any]) -> Dict[str, Any]:
+        title = e.get("dc:title")
+        doi = e.get("prism:doi")
+        abstract = e.get("dc:description") or ""
+        if "&" in abstract:  # most abstracts carry no entity refs
+            abstract = html.unescape(abstract)
+
+        cover_date = e.get("prism:coverDate")  # "YYYY-MM-DD"
+        year = cover_date[:4] if cover_date and len(cover_date) >= 4 else None
+
+        creator = e.get("dc:creator")  # "Surname, Given"
+        if creator:
+            surname = creator.split(",")[0].strip()
+            authors = [creator]
+        else:
+            surname = "Anon"
+            authors = []
+
+        citekey = f"{surname}{year or 'n.d.'}"
+
+        return {
+            "title": title,
+            "doi": doi,
+            "abstract": abstract,
+            "year": year,
+            "citekey": citekey,
+            "authors": authors,
+            "venue": e.get("prism:publicationName"),
+            "volume": e.get("prism:volume"),
+            "issue": e.get("prism:issueIdentifier"),
+            "pages": e.get("prism:pageRange"),
+            "publisher": None,
+            "source": "scopus",
+        }
@@ -1,13 +1,40 @@
+import asyncio
 import os
-import requests
 import html
-from typing import List, Dict, Any
-from tenacity import retry, wait_exponential, stop_after_attempt
+import time
+from typing import List, Dict, Any, Mapping, Optional, Tuple
+
+import aiohttp
+import orjson
+import requests
+from tenacity import retry, retry_if_exception, stop_after_attempt
 
-from .base import BaseRetriever
+from .base import BaseRetriever, HTTP_TIMEOUT, client_session, retry_wait, retryable
 
 WOS_KEY = os.getenv("WOS_API_KEY")
 WOS_URL = "https://api.clarivate.com/api/wos"  # Expanded API base
+PAGE_CONCURRENCY = 4  # pages in flight at once (async path)
+THROTTLE_COOLDOWN = 30.0  # seconds to ramp concurrency back up after a 429
+_EMPTY: Mapping[str, Any] = {}  # shared read-only default for missing JSON levels
+_last_429 = 0.0  # monotonic time of the last throttled response (per process)
+
+
+def _note_status(status: int) -> None:
+    global _last_429
+    if status == 429:
+        _last_429 = time.monotonic()
+
+
+def _page_concurrency() -> int:
+    """1 right after a 429, rising linearly back to `PAGE_CONCURRENCY` over the cooldown."""
+    elapsed = time.monotonic() - _last_429
+    if elapsed >= THROTTLE_COOLDOWN:
+        return PAGE_CONCURRENCY
+    return 1 + int((PAGE_CONCURRENCY - 1) * elapsed / THROTTLE_COOLDOWN)
+
+
+# more attempts than HTTP_ARETRY: WoS throttles hard and says for how long
+_RETRY = retry(retry=retry_if_exception(retryable), wait=retry_wait, stop=stop_after_attempt(5), reraise=True)
 
 
 class WosRetriever(BaseRetriever):
@@ -17,120 +44,162 @@ class WosRetriever(BaseRetriever):
     - Requires `WOS_API_KEY` entitlement and subscription.
     - Uses `databaseId=WOS` (per recent docs) and `usrQuery`.
     - Parses common fields; keeps code robust to minor response schema variations.
+    - The async variant learns the hit count from page one and requests the
+      remaining pages concurrently (fewer at once right after being throttled).
+    - Retries 429/5xx with jittered backoff, honouring `Retry-After`.
     """
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-    def _request(self, headers: Dict[str, str], params: Dict[str, Any]) -> Dict[str, Any]:
-        resp = requests.get(WOS_URL, headers=headers, params=params, timeout=30)
-        resp.raise_for_status()
-        return resp.json() or {}
+    def _build_session(self) -> requests.Session:
+        session = super()._build_session()
+        if WOS_KEY:  # sent with every request; set once instead of per call
+            session.headers["X-ApiKey"] = WOS_KEY
+        return session
 
-    def fetch_metadata(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
+    @_RETRY
+    def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        resp = self._session.get(WOS_URL, params=params, timeout=30)
+        _note_status(resp.status_code)
+        resp.raise_for_status()
+        return (orjson.loads(resp.content) if resp.content else None) or {}
+
+    @_RETRY
+    async def _arequest(self, session: aiohttp.ClientSession, params: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {"X-ApiKey": WOS_KEY}  # a shared session carries no per-API headers
+        async with self._aget(session, WOS_URL, headers=headers, params=params, timeout=HTTP_TIMEOUT) as resp:
+            _note_status(resp.status)
+            resp.raise_for_status()
+            body = await resp.read()
+            return (orjson.loads(body) if body else None) or {}
+
+    @staticmethod
+    def _records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Try Expanded API JSON shape
+        recs = (
+            (data.get("Data") or {})
+            .get("Records", {})
+            .get("records", {})
+            .get("REC", [])
+        )
+        if not recs and isinstance(data.get("hits"), list):  # Starter-like
+            recs = data.get("hits", [])
+        return recs or []
+
+    @staticmethod
+    def _records_found(data: Dict[str, Any]) -> int:
+        found = (data.get("QueryResult") or {}).get("RecordsFound")
+        return int(found) if found is not None else 0
+
+    @staticmethod
+    def _build_params(query: str, k: int) -> Tuple[Dict[str, Any], int]:
         if not WOS_KEY:
             raise EnvironmentError("WOS_API_KEY not set")
-
-        headers = {"X-ApiKey": WOS_KEY}
         page_size = max(1, min(int(k or 20), 50))
-        params = {"databaseId": "WOS", "usrQuery": query, "count": page_size}
+        return {"databaseId": "WOS", "usrQuery": query, "count": page_size}, page_size
+
+    def fetch_metadata(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
+        params, page_size = self._build_params(query, k)
 
         results: List[Dict[str, Any]] = []
         first_record = 1
         while len(results) < k:
             params["firstRecord"] = first_record
-            data = self._request(headers, params)
-
-            # Try Expanded API JSON shape
-            recs = (
-                (data.get("Data") or {})
-                .get("Records", {})
-                .get("records", {})
-                .get("REC", [])
-            )
+            recs = self._records(self._request(params))
+            if not recs:
+                break
+            results.extend(self._parse_rec(r) for r in recs[: k - len(results)])
+            first_record += page_size
 
-            if not recs and isinstance(data.get("hits"), list):  # Starter-like
-                recs = data.get("hits", [])
+        return results
 
+    async def afetch_metadata(
+        self, query: str, k: int = 20, session: Optional[aiohttp.ClientSession] = None
+    ) -> List[Dict[str, Any]]:
+        """First page sequentially (it reports `RecordsFound`), the rest concurrently."""
+        params, page_size = self._build_params(query, k)
+        async with client_session(session) as s:
+            first = await self._arequest(s, {**params, "firstRecord": 1})
+            recs = self._records(first)
             if not recs:
-                break
+                return []
+            total = min(k, self._records_found(first) or k)
+            gate = asyncio.Semaphore(_page_concurrency())  # stay inside Clarivate's rate limits
+
+            async def page(first_record: int) -> List[Dict[str, Any]]:
+                async with gate:
+                    return self._records(await self._arequest(s, {**params, "firstRecord": first_record}))
+
+            pages = await asyncio.gather(*(page(1 + off) for off in range(page_size, total, page_size)))
 
-            for r in recs:
-                static = (r.get("static_data") or {}) if isinstance(r, dict) else {}
-                summary = (static.get("summary") or {}) if isinstance(static, dict) else {}
-
-                # Title
-                titles = (summary.get("titles") or {}).get("title", [])
-                title = ""
-                if isinstance(titles, list):
-                    for t in titles:
-                        if isinstance(t, dict) and t.get("content"):
-                            title = t["content"]
-                            break
-
-                # DOI
-                dyn = (r.get("dynamic_data") or {}) if isinstance(r, dict) else {}
-                idents = ((dyn.get("cluster_related") or {}).get("identifiers") or {}).get("identifier", [])
-                doi = None
-                for idobj in idents:
-                    t = (idobj.get("@type") or "").lower()
-                    if t == "doi" or "doi" in t:
-                        doi = idobj.get("@value")
-                        break
-
-                # Abstract
-                abstract = (
-                    (((summary.get("abstracts") or {}).get("abstract") or {}).get("p"))
-                    if isinstance(summary, dict)
-                    else ""
-                )
-                abstract = html.unescape(abstract) if abstract else ""
-
-                # Year / venue
-                pub_info = summary.get("pub_info") or {}
-                year = pub_info.get("pubyear") or pub_info.get("@pubyear")
-                venue = (summary.get("pub_info") or {}).get("@pubtype") or None
-                # Some responses include journal name in titles with type="source"
-                if not venue and isinstance(titles, list):
-                    for t in titles:
-                        if t.get("@type") == "source" and t.get("content"):
-                            venue = t["content"]
-                            break
-
-                # Authors
-                names = (summary.get("names") or {}).get("name", [])
-                authors: List[str] = []
-                surname = "Anon"
-                if isinstance(names, list) and names:
-                    first = names[0]
-                    last_name = first.get("last_name") or ""
-                    first_name = first.get("first_name") or ""
-                    surname = last_name or "Anon"
-                    for n in names:
-                        a_last = n.get("last_name") or ""
-                        a_first = n.get("first_name") or ""
-                        nm = f"{a_first} {a_last}".strip()
-                        if nm:
-                            authors.append(nm)
-
-                citekey = f"{surname}{year or 'n.d.'}"
-
-                results.append({
-                    "title": title,
-                    "doi": doi,
-                    "abstract": abstract,
-                    "year": year,
-                    "citekey": citekey,
-                    "authors": authors,
-                    "venue": venue,
-                    "publisher": None,
-                    "volume": (pub_info.get("vol") or pub_info.get("@vol")),
-                    "issue": (pub_info.get("issue") or pub_info.get("@issue")),
-                    "pages": (pub_info.get("page") or pub_info.get("@page")),
-                    "source": "wos",
-                })
-
-                if len(results) >= k:
+        for more in pages:
+            if not more:  # past the last page of hits
+                break
+            recs.extend(more)
+        return [self._parse_rec(r) for r in recs[:k]]
+
+    @staticmethod
+    def _parse_rec(r: Dict[str, Any]) -> Dict[str, Any]:
+        # `_EMPTY` stands in for every missing level, so no throwaway dict per lookup
+        static = (r.get("static_data") or _EMPTY) if isinstance(r, dict) else _EMPTY
+        summary = (static.get("summary") or _EMPTY) if isinstance(static, dict) else _EMPTY
+
+        # Title (+ journal name, which some responses put in titles with type="source")
+        titles = (summary.get("titles") or _EMPTY).get("title", ())
+        title = ""
+        source = None
+        if isinstance(titles, list):
+            for t in titles:
+                if not isinstance(t, dict):
+                    continue
+                content = t.get("content")
+                if content and not title:
+                    title = content
+                if content and source is None and t.get("@type") == "source":
+                    source = content
+                if title and source:
                     break
 
-            first_record += page_size
+        # DOI
+        dyn = (r.get("dynamic_data") or _EMPTY) if isinstance(r, dict) else _EMPTY
+        idents = ((dyn.get("cluster_related") or _EMPTY).get("identifiers") or _EMPTY).get("identifier", ())
+        doi = None
+        for idobj in idents:
+            if "doi" in (idobj.get("@type") or "").lower():
+                doi = idobj.get("@value")
+                break
 
-        return results
\ No newline at end of file
+        # Abstract
+        abstract = ((summary.get("abstracts") or _EMPTY).get("abstract") or _EMPTY).get("p")
+        abstract = html.unescape(abstract) if abstract else ""
+
+        # Year / venue
+        pub_info = summary.get("pub_info") or _EMPTY
+        year = pub_info.get("pubyear") or pub_info.get("@pubyear")
+        venue = pub_info.get("@pubtype") or source
+
+        # Authors
+        names = (summary.get("names") or _EMPTY).get("name", ())
+        authors: List[str] = []
+        surname = "Anon"
+        if isinstance(names, list) and names:
+            surname = names[0].get("last_name") or "Anon"
+            for n in names:
+                nm = f"{n.get('first_name') or ''} {n.get('last_name') or ''}".strip()
+                if nm:
+                    authors.append(nm)
+
+        citekey = f"{surname}{year or 'n.d.'}"
+
+        return {
+            "title": title,
+            "doi": doi,
+            "abstract": abstract,
+            "year": year,
+            "citekey": citekey,
+            "authors": authors,
+            "venue": venue,
+            "publisher": None,
+            "volume": (pub_info.get("vol") or pub_info.get("@vol")),
+            "issue": (pub_info.get("issue") or pub_info.get("@issue")),
+            "pages": (pub_info.get("page") or pub_info.get("@page")),
+            "source": "wos",
+        }
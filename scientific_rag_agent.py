@@ -23,8 +23,11 @@ current directory.
 
 from __future__ import annotations
 
+import asyncio
+import html
 import os
 import re
+import threading
 import time
 import json
 import math
@@ -32,15 +35,21 @@ import textwrap
 from pathlib import Path
 from typing import List, Tuple
 import numpy as np
+import orjson
 
-import requests
-from bs4 import BeautifulSoup, FeatureNotFound
+import aiohttp
 import faiss  # cpu build
 from dotenv import load_dotenv
 from openai import OpenAI
 
 # ── Load environment ---------------------------------------------------------
-load_dotenv()
+load_dotenv()  # before app imports: several modules read settings at import time
+
+from rag_agent.retrievers.base import HTTP_ARETRY
+from utils.embed_cache import get_or_compute
+from utils.search_terms import generate_search_terms
+from utils.semantic_cache import default_cache, is_cacheable
+
 client = OpenAI()
 MAILTO = "emirhan.soylu@databeeg.com"
 
@@ -49,30 +58,37 @@ CROSSREF_URL = "https://api.crossref.org/works"
 HEADERS = {"User-Agent": f"literature-agent/0.1 (+{MAILTO})"}
 EMBED_MODEL = "text-embedding-3-small"
 MAX_INPUT_TOKENS = 8192  # per item token limit for the embedding model
-BATCH_SIZE = 100         # number of texts per embedding call
+EMBED_RPM = 3000         # embedding requests per minute allowed by the account tier
+EMBED_BURST = 5          # requests that may go out back to back before pacing kicks in
+HNSW_MIN_DOCS = 1000     # exact flat scan below this corpus size
+REVIEW_CACHE_THRESHOLD = 0.92  # cosine similarity for reusing a review of a paraphrased topic
 
 # ── Helpers ------------------------------------------------------------------
 
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
 def _clean_html_abstract(jats: str) -> str:
-    """Strip JATS/HTML tags → plain text."""
-    try:
-        soup = BeautifulSoup(jats, "lxml")
-    except FeatureNotFound:
-        soup = BeautifulSoup(jats, "html.parser")
-    txt = soup.get_text(separator=" ", strip=True)
+    """Strip JATS/HTML tags → plain text (JATS markup is shallow: no parser needed)."""
+    txt = _TAG_RE.sub(" ", jats)
+    if "&" in txt:
+        txt = html.unescape(txt)
     # collapse excessive whitespace
-    return re.sub(r"\s+", " ", txt)
+    return _WS_RE.sub(" ", txt).strip()
 
 def _truncate(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
     """Rough truncation by words (≈ tokens) to stay under model limit."""
-    words = text.split()
+    if len(text) < 2 * max_tokens:  # every word but the last needs a separator: can't exceed
+        return text
+    words = text.split(maxsplit=max_tokens)  # at most max_tokens + 1 pieces
     if len(words) <= max_tokens:
         return text
     return " ".join(words[:max_tokens])
 
 # ── Crossref Search ----------------------------------------------------------
 
-def search_papers(query: str, k: int = 20) -> List[dict]:
+def _search_params(query: str, k: int) -> dict:
     params = {
         "query": query,
         "rows": k,
@@ -80,9 +96,30 @@ def search_papers(query: str, k: int = 20) -> List[dict]:
     }
     if MAILTO:
         params["mailto"] = MAILTO
-    r = requests.get(CROSSREF_URL, params=params, headers=HEADERS, timeout=40)
-    r.raise_for_status()
-    return r.json()["message"]["items"]
+    return params
+
+
+@HTTP_ARETRY  # 429/5xx and transport errors: back off (Retry-After aware) instead of dropping the term
+async def search_papers_async(session: aiohttp.ClientSession, query: str, k: int = 20) -> List[dict]:
+    async with session.get(CROSSREF_URL, params=_search_params(query, k)) as r:
+        r.raise_for_status()
+        return orjson.loads(await r.read())["message"]["items"]
+
+
+async def search_all(queries: List[str], k: int = 20) -> List[dict]:
+    """Run all queries concurrently; items are de-duplicated by DOI (first hit wins)."""
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=aiohttp.ClientTimeout(total=40)) as s:
+        batches = await asyncio.gather(*(search_papers_async(s, q, k) for q in queries), return_exceptions=True)
+    failed = [b for b in batches if isinstance(b, BaseException)]
+    if len(failed) == len(batches):
+        raise failed[0]
+    merged: dict = {}
+    for batch in batches:
+        if isinstance(batch, BaseException):
+            continue
+        for it in batch:
+            merged.setdefault(it.get("DOI") or id(it), it)
+    return list(merged.values())
 
 # ── Text Extraction ----------------------------------------------------------
 
@@ -103,42 +140,111 @@ def extract_texts(items: List[dict]) -> List[str]:
 
 # ── Embedding & FAISS --------------------------------------------------------
 
+class _TokenBucket:
+    """Paces calls to `per_minute`, letting up to `burst` through back to back."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """The server says the quota is used up: hold every caller for `seconds`."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            # a debt of `seconds` worth of tokens: reserve() waits until it is repaid
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+_EMBED_LIMIT = _TokenBucket(EMBED_RPM, EMBED_BURST)
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> float:
+    """OpenAI reset durations ("20ms", "1s", "6m0s") → seconds; 0.0 if unparseable."""
+    return sum((float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_RE.findall(value or "")), 0.0)
+
+
+def _note_quota(headers) -> None:
+    if headers.get("x-ratelimit-remaining-requests") == "0":
+        # no reset hint: wait a second rather than walk straight into a 429
+        _EMBED_LIMIT.pause(_parse_duration(headers.get("x-ratelimit-reset-requests")) or 1.0)
+
+
 def embed_batch(batch: List[str]) -> List[List[float]]:
-    resp = client.embeddings.create(model=EMBED_MODEL, input=batch)
-    return [d.embedding for d in resp.data]
+    wait = _EMBED_LIMIT.reserve()
+    if wait:
+        time.sleep(wait)
+    raw = client.embeddings.with_raw_response.create(model=EMBED_MODEL, input=batch)
+    _note_quota(raw.headers)
+    return [d.embedding for d in raw.parse().data]
 
 
-def build_index(texts: List[str]) -> Tuple[faiss.IndexFlatL2, List[str]]:
-    nonempty = [t for t in texts if t and t.strip()]
+def build_index(texts: List[str]) -> Tuple[faiss.Index, List[str]]:
+    # the same paper often comes back from several search terms: index each text once
+    nonempty = list(dict.fromkeys(t for t in texts if t and t.strip()))
     if not nonempty:
         raise RuntimeError("No non‑empty abstracts or titles were retrieved from Crossref.")
 
     print(f"📐  Embedding {len(nonempty)} texts …")
-    vectors: List[List[float]] = []
-    for i in range(0, len(nonempty), BATCH_SIZE):
-        chunk = nonempty[i : i + BATCH_SIZE]
-        vectors.extend(embed_batch(chunk))
-        time.sleep(0.5)  # courtesy pause
-
-    vec_array = np.asarray(vectors, dtype="float32")
+    # on-disk cache keyed by (model, sha256(text)): only unseen texts hit the API,
+    # in EMBED_BATCH_SIZE batches sent EMBED_CONCURRENCY at a time by get_or_compute
+    vec_array = get_or_compute(nonempty, EMBED_MODEL, embed_fn=embed_batch)
+    faiss.normalize_L2(vec_array)  # inner product == cosine similarity
     dim = vec_array.shape[1]
-    index = faiss.IndexFlatL2(dim)
+    # vectors are stored as fp16 (half the memory traffic per scan); queries stay fp32
+    if len(nonempty) < HNSW_MIN_DOCS:
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    else:  # graph search: sub-linear queries once multi-term retrieval grows the corpus
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 80
+        index.hnsw.efSearch = 32
     index.add(vec_array)
     return index, nonempty
 
 # ── Retrieval + GPT Synthesis ------------------------------------------------
 
-def knn_search(index: faiss.IndexFlatL2, query: str, docs: List[str], k: int = 5) -> str:
-    qemb = client.embeddings.create(model=EMBED_MODEL, input=query).data[0].embedding
-    D, I = index.search(np.asarray([qemb], dtype="float32"), k)
-    return "\n\n".join(docs[i] for i in I[0])
+def knn_search(index: faiss.Index, query_vec: np.ndarray, docs: List[str], k: int = 5) -> str:
+    """Join the `k` docs nearest to an (un-normalised) query embedding."""
+    qemb = np.array(query_vec, dtype=np.float32, ndmin=2)  # a copy: normalize_L2 works in place
+    faiss.normalize_L2(qemb)
+    D, I = index.search(qemb, min(k, index.ntotal))
+    return "\n\n".join(docs[i] for i in I[0] if i >= 0)
 
 
 def generate_review(topic: str) -> str:
-    items = search_papers(topic)
+    # near-duplicate topics reuse an earlier review (no Crossref / embeddings / LLM)
+    topic_vec = get_or_compute([topic], EMBED_MODEL, embed_fn=embed_batch)
+    cacheable = is_cacheable(topic)
+    if cacheable:
+        hit = default_cache().lookup(topic_vec, namespace="cli", threshold=REVIEW_CACHE_THRESHOLD)
+        if hit is not None:
+            return hit["review"]
+
+    try:  # concise English queries help with long or non-English topics
+        terms = generate_search_terms(topic, "English")
+    except Exception:
+        terms = []
+    items = asyncio.run(search_all([topic, *terms]))
     texts = extract_texts(items)
     index, corpus = build_index(texts)
-    context = knn_search(index, topic, corpus, k=5)
+    context = knn_search(index, topic_vec, corpus, k=5)
 
     system = (
         "You are an expert academic writer. Using the CONTEXT, write a concise "
@@ -150,7 +256,10 @@ def generate_review(topic: str) -> str:
         {"role": "user", "content": f"CONTEXT:\n{context}\n\nTASK: Write the review."},
     ]
     resp = client.chat.completions.create(model="gpt-4o-mini", messages=msg, temperature=0.3)
-    return resp.choices[0].message.content
+    review = resp.choices[0].message.content
+    if cacheable:
+        default_cache().store(topic_vec, {"review": review}, namespace="cli")
+    return review
 
 # ── CLI ----------------------------------------------------------------------
 
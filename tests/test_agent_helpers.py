@@ -0,0 +1,153 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from rag_agent import agent
+from rag_agent.agent import _merge_dedupe_index
+from utils import vector_index
+
+
+def test_merge_dedupe_index_drops_duplicates_and_suffixes_citekeys():
+    records = [
+        {"citekey": "Smith2020", "doi": "10.1/ABC", "title": "First"},
+        {"citekey": "Lee2021", "doi": "10.1/abc", "title": "Same DOI, other case"},
+        {"citekey": "Smith2020", "doi": None, "title": "Second"},
+        {"citekey": "Kim2022", "doi": None, "title": "second "},
+        {"citekey": "Smith2020", "doi": "10.2/xyz", "title": "Third"},
+    ]
+
+    merged, by_ck = _merge_dedupe_index(records)
+
+    assert [r["citekey"] for r in merged] == ["Smith2020a", "Smith2020b", "Smith2020c"]
+    assert set(by_ck) == {"Smith2020a", "Smith2020b", "Smith2020c"}
+    assert by_ck["Smith2020b"]["title"] == "Second"
+    # inputs are not mutated
+    assert records[0]["citekey"] == "Smith2020"
+
+
+def test_select_top_records_ranks_by_cosine_not_magnitude(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_index, "INDEX_DIR", str(tmp_path))
+    # a handful of records is searched inline, never shipped to the process pool
+    monkeypatch.setattr(agent, "process_pool", lambda: pytest.fail("small corpus used the process pool"))
+    vectors = {"near": [10.0, 1.0], "far": [0.2, 1.0], "mid": [1.0, 1.0]}
+    monkeypatch.setattr(
+        agent, "get_or_compute",
+        lambda texts, model: np.asarray([vectors[t] for t in texts], dtype=np.float32),
+    )
+    records = [{"title": name} for name in ("far", "mid", "near")]
+
+    top = asyncio.run(agent._select_top_records(np.array([1.0, 0.0]), records, k=2))
+
+    assert [r["title"] for r in top] == ["near", "mid"]
+
+
+def test_paren_to_bracket_citations_with_and_without_dois():
+    text = "See (Smith2020; Lee2021a.) and (Smith2020 ,)."
+    assert agent._paren_to_bracket_citations(text, {}) == "See [Smith2020] [Lee2021a] and [Smith2020]."
+    assert agent._paren_to_bracket_citations(text, {"Smith2020": "10.1/x"}) == (
+        "See [Smith2020][10.1/x] [Lee2021a] and [Smith2020][10.1/x]."
+    )
+
+
+def test_paren_to_bracket_citations_collects_cited_keys_in_same_pass():
+    cited = {}
+    agent._paren_to_bracket_citations("(Lee2021a; Smith2020) then (Smith2020Deep.)", {}, cited)
+    assert list(cited) == ["Lee2021a", "Smith2020", "Smith2020Deep"]
+
+
+def test_select_top_records_reuses_persisted_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_index, "INDEX_DIR", str(tmp_path))
+    calls = []
+
+    def fake_embed(texts, model):
+        calls.append(len(texts))
+        return np.asarray([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    monkeypatch.setattr(agent, "get_or_compute", fake_embed)
+    records = [{"title": "x" * n} for n in range(1, 6)]
+
+    first = asyncio.run(agent._select_top_records(np.array([1.0, 0.0]), records, k=2))
+    second = asyncio.run(agent._select_top_records(np.array([1.0, 0.0]), records, k=2))
+
+    assert first == second == [records[4], records[3]]
+    assert calls == [5]
+    assert len(list(tmp_path.glob("*.faiss"))) == 1
+
+
+def test_top_k_indices_use_gpu_falls_back_to_cpu():
+    xb = np.asarray([[0.2, 1.0], [1.0, 1.0], [10.0, 1.0]], dtype=np.float32)
+    q = np.array([1.0, 0.0])
+
+    assert vector_index.top_k_indices(xb, q, 2, use_gpu=True) == vector_index.top_k_indices(xb, q, 2) == [2, 1]
+
+
+def test_save_index_prunes_least_recently_used(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_index, "INDEX_MAX_FILES", 2)
+    xb = np.asarray([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    paths = [str(tmp_path / f"{name}.faiss") for name in ("a", "b", "c")]
+
+    vector_index.save_index(vector_index.build_index(xb), paths[0])
+    vector_index.save_index(vector_index.build_index(xb), paths[1])
+    os.utime(paths[0], (0, 0))
+    os.utime(paths[1], (1, 1))
+    assert vector_index.load_index(paths[0]) is not None  # reuse refreshes "a"
+    vector_index.save_index(vector_index.build_index(xb), paths[2])
+
+    assert sorted(p.name for p in tmp_path.glob("*.faiss")) == ["a.faiss", "c.faiss"]
+    assert vector_index.load_index(paths[1]) is None
+
+
+def test_generate_review_stream_emits_sections_before_the_draft_is_complete(monkeypatch):
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.output_parsers import JsonOutputParser
+
+    log = []
+
+    class StreamingFakeLLM(GenericFakeChatModel):
+        def _stream(self, *args, **kwargs):
+            for chunk in super()._stream(*args, **kwargs):
+                log.append("token")
+                yield chunk
+
+        def with_structured_output(self, schema, **kwargs):
+            assert isinstance(schema, dict)  # JSON schema → partial-capable parser
+            return self | JsonOutputParser()
+
+    draft = (
+        '{"title": "T", "summary": "S (Smith2020)", "sections": ['
+        '{"heading": "One", "body": "First (Smith2020)."}, '
+        '{"heading": "Two", "body": "Second part."}], '
+        '"limitations": "L", "references": ["Smith2020"]}'
+    )
+    monkeypatch.setattr(agent, "build_llm", lambda: StreamingFakeLLM(messages=iter([AIMessage(content=draft)])))
+
+    async def fake_prepare(topic, citation_format, language, *args, stream=False, **kwargs):
+        return {
+            "query_vec": None,
+            "cache": None,
+            "cache_ns": None,
+            "by_ck": {"Smith2020": {"citekey": "Smith2020", "doi": "10.1/x", "title": "Paper"}},
+            "chain": agent._draft_chain(stream),
+            "inputs": {"topic": topic, "language": language, "records_json": "[]"},
+        }
+
+    monkeypatch.setattr(agent, "_prepare", fake_prepare)
+
+    async def collect():
+        events = []
+        async for event in agent.generate_review_stream("topic"):
+            log.append(event["event"])
+            events.append(event)
+        return events
+
+    events = asyncio.run(collect())
+
+    assert [(e["event"], e.get("index")) for e in events] == [("section", 0), ("section", 1), ("done", None)]
+    assert events[0]["body"] == "First [Smith2020][10.1/x]."
+    # both sections went out while the model was still producing tokens
+    last_token = max(i for i, entry in enumerate(log) if entry == "token")
+    assert all(i < last_token for i, entry in enumerate(log) if entry == "section")
+    assert events[-1]["result"].startswith("S [Smith2020][10.1/x]")
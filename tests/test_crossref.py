@@ -1,4 +1,8 @@
+import asyncio
 import os
+
+import orjson
+
 from rag_agent.retrievers.crossref import CrossrefRetriever
 
 
@@ -11,4 +15,71 @@ def test_crossref_basic():
     for item in data:
         assert "title" in item
         assert "abstract" in item
-        assert "citekey" in item
\ No newline at end of file
+        assert "citekey" in item
+
+def test_strip_html_matches_parse_then_unescape():
+    strip = CrossrefRetriever._strip_html
+    assert strip("<jats:p>Graphene</jats:p><jats:p>oxide &amp; water</jats:p>") == "Graphene oxide & water"
+    # double-escaped entities are fully decoded, with or without markup
+    assert strip("<p>a &amp;lt; b</p>") == "a < b"
+    assert strip("a &amp;lt; b") == "a < b"
+    assert strip("  plain\n text ") == "plain text"
+    assert strip("") == ""
+
+
+class _FakeResponse:
+    def __init__(self, items, total):
+        self.content = orjson.dumps({"message": {"items": items, "total-results": total}})
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    """Serves `available` Crossref items in offset/rows pages and records each request."""
+
+    def __init__(self, available, total):
+        self.available, self.total, self.calls = available, total, []
+
+    def get(self, url, params=None, **kwargs):
+        off, rows = params.get("offset", 0), params["rows"]
+        self.calls.append((off, rows))
+        items = [{"title": [f"T{i}"], "DOI": f"10.1/{i}"} for i in range(off, min(off + rows, self.available))]
+        return _FakeResponse(items, self.total)
+
+
+def test_fetch_metadata_pages_by_offset_and_stops_on_short_page():
+    r = CrossrefRetriever()
+    r._session = _FakeSession(available=230, total=1000)
+
+    out = r.fetch_metadata("graphene", k=450)
+
+    assert r._session.calls == [(0, 100), (100, 100), (200, 100)]
+    assert [x["doi"] for x in out] == [f"10.1/{i}" for i in range(230)]
+
+
+def test_afetch_metadata_pages_concurrently_up_to_k():
+    session = _FakeSession(available=1000, total=1000)
+
+    out = asyncio.run(CrossrefRetriever().afetch_metadata("graphene", k=250, session=session))
+
+    assert sorted(session.calls) == [(0, 100), (100, 100), (200, 50)]
+    assert [x["doi"] for x in out] == [f"10.1/{i}" for i in range(250)]
+
+
+def test_afetch_metadata_drops_pages_after_a_short_one():
+    session = _FakeSession(available=150, total=400)
+
+    out = asyncio.run(CrossrefRetriever().afetch_metadata("graphene", k=400, session=session))
+
+    assert sorted(session.calls) == [(0, 100), (100, 100), (200, 100), (300, 100)]
+    assert len(out) == 150
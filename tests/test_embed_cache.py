@@ -0,0 +1,35 @@
+import numpy as np
+
+from utils import embed_cache
+from utils.embed_cache import get_or_compute
+
+
+def test_embed_cache_only_embeds_misses(tmp_path):
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    path = str(tmp_path / "emb.sqlite3")
+    first = get_or_compute(["ab", "abc", "ab"], model="m", embed_fn=fake_embed, path=path)
+    second = get_or_compute(["abc", "abcd"], model="m", embed_fn=fake_embed, path=path)
+
+    assert calls == [["ab", "abc"], ["abcd"]]
+    assert first.shape == (3, 2) and first.dtype == np.float32
+    assert np.array_equal(first[1], second[0])
+
+
+def test_embed_cache_splits_misses_into_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(embed_cache, "EMBED_BATCH_SIZE", 2)
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    out = get_or_compute(texts, model="m", embed_fn=fake_embed, path=str(tmp_path / "emb.sqlite3"))
+
+    assert sorted(calls) == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+    assert out[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
@@ -0,0 +1,90 @@
+import asyncio
+import sqlite3
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from rag_agent.retrievers import base
+
+
+SECRET = "s3cr3t-api-key-value"
+
+
+class _Cached(base.BaseRetriever):
+    http_cache = True
+
+    def fetch_metadata(self, query, k=20):
+        return []
+
+
+class _Uncached(_Cached):
+    http_cache = False
+
+
+def _run(monkeypatch, tmp_path, retriever, path="/works"):
+    monkeypatch.setattr(base, "HTTP_CACHE_PATH", str(tmp_path / "http"))
+    monkeypatch.setattr(base, "HTTP_CACHE_TTL", 3600)
+    hits = []
+
+    async def handler(request):
+        hits.append(request.headers.get("X-ApiKey"))
+        return web.json_response({"ok": True})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get(path, handler)
+        async with TestServer(app) as server:
+            async with base.client_session() as session:
+                for _ in range(2):
+                    async with retriever._aget(session, str(server.make_url(path)), headers={"X-ApiKey": SECRET}) as r:
+                        assert (await r.json()) == {"ok": True}
+
+    asyncio.run(main())
+    return hits, tmp_path / "http-async.sqlite"
+
+
+def _dump(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [t for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        return b"".join(
+            bytes(v) if isinstance(v, (bytes, memoryview)) else str(v).encode()
+            for t in tables for row in conn.execute(f"SELECT * FROM {t}") for v in row
+        )
+    finally:
+        conn.close()
+
+
+def test_async_cache_serves_repeats_without_storing_credentials(monkeypatch, tmp_path):
+    hits, db = _run(monkeypatch, tmp_path, _Cached())
+
+    assert hits == [SECRET]  # second request answered from the cache
+    dump = _dump(db)
+    assert b"/works" in dump and SECRET.encode() not in dump
+
+
+def test_async_cache_skipped_for_retrievers_without_http_cache(monkeypatch, tmp_path):
+    hits, db = _run(monkeypatch, tmp_path, _Uncached())
+
+    assert hits == [SECRET, SECRET]
+    assert SECRET.encode() not in _dump(db)
+
+
+def test_shared_session_only_where_opened_and_closed_on_shutdown(monkeypatch, tmp_path):
+    monkeypatch.setattr(base, "HTTP_CACHE_PATH", str(tmp_path / "http"))
+
+    async def server_lifetime():
+        assert base.shared_session() is None  # not opened: callers use client_session()
+        await base.open_shared_session()
+        session = base.shared_session()
+        assert session is not None and base.shared_session() is session
+        return session
+
+    async def other_loop():
+        # a session can't be used from another event loop
+        assert base.shared_session() is None
+        await base.close_shared_session()
+
+    session = asyncio.run(server_lifetime())
+    asyncio.run(other_loop())
+    assert session.closed
@@ -0,0 +1,21 @@
+from utils import search_terms
+
+
+def test_search_terms_are_memoized_per_topic_and_language(monkeypatch):
+    calls = []
+
+    def fake_generate(topic, language, max_terms):
+        calls.append((topic, language, max_terms))
+        return [f"{topic} {language}"]
+
+    monkeypatch.setattr(search_terms, "_generate", fake_generate)
+    search_terms._cached_terms.cache_clear()
+
+    first = search_terms.generate_search_terms("graphene", "English")
+    first.append("mutated by caller")
+    second = search_terms.generate_search_terms("graphene", "English")
+    search_terms.generate_search_terms("graphene", "Turkish")
+    search_terms._cached_terms.cache_clear()
+
+    assert second == ["graphene English"]
+    assert calls == [("graphene", "English", 3), ("graphene", "Turkish", 3)]
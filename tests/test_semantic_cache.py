@@ -0,0 +1,62 @@
+import numpy as np
+
+from utils import semantic_cache
+from utils.semantic_cache import SemanticCache, is_cacheable
+
+
+def test_semantic_cache_hit_miss_and_namespaces(tmp_path):
+    path = str(tmp_path / "sem.pkl")
+    cache = SemanticCache(path, threshold=0.92)
+    cache.store(np.array([1.0, 0.0, 0.0]), {"result": "a"}, namespace="english|raw")
+
+    assert cache.lookup([0.99, 0.05, 0.0], namespace="english|raw") == {"result": "a"}
+    assert cache.lookup([0.0, 1.0, 0.0], namespace="english|raw") is None
+    assert cache.lookup([1.0, 0.0, 0.0], namespace="german|raw") is None
+
+    # persisted across instances
+    assert SemanticCache(path).lookup([1.0, 0.0, 0.0], namespace="english|raw") == {"result": "a"}
+
+
+def test_semantic_cache_respects_ttl(tmp_path):
+    cache = SemanticCache(str(tmp_path / "sem.pkl"))
+    cache.store([0.0, 1.0], {"result": "old"}, ttl=-1)
+    assert cache.lookup([0.0, 1.0]) is None
+
+
+def test_semantic_cache_evicts_least_recently_used(tmp_path):
+    cache = SemanticCache(str(tmp_path / "sem.pkl"), max_entries=2)
+    cache.store([1.0, 0.0, 0.0], {"result": "a"})
+    cache.store([0.0, 1.0, 0.0], {"result": "b"}, namespace="other")
+    assert cache.lookup([1.0, 0.0, 0.0]) == {"result": "a"}  # refresh "a"
+
+    cache.store([0.0, 0.0, 1.0], {"result": "c"})
+
+    assert cache.lookup([0.0, 1.0, 0.0], namespace="other") is None
+    assert cache.lookup([1.0, 0.0, 0.0]) == {"result": "a"}
+    assert cache.lookup([0.0, 0.0, 1.0]) == {"result": "c"}
+
+
+def test_time_sensitive_topics_are_not_cacheable():
+    assert is_cacheable("Graph neural networks for drug discovery")
+    assert not is_cacheable("Latest advances in graph neural networks")
+    assert not is_cacheable("What happened in LLM research this year")
+
+
+def test_lookup_threshold_can_be_overridden_per_call(tmp_path):
+    cache = SemanticCache(str(tmp_path / "sem.pkl"), threshold=0.99)
+    cache.store([1.0, 0.0], {"result": "a"})
+
+    assert cache.lookup([1.0, 0.3]) is None  # cosine ≈ 0.958
+    assert cache.lookup([1.0, 0.3], threshold=0.92) == {"result": "a"}
+
+
+def test_lookup_skips_an_expired_nearest_entry(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    cache = SemanticCache(str(tmp_path / "sem.pkl"), threshold=0.9)
+    cache.store([1.0, 0.0], {"result": "expired"}, ttl=10)
+    cache.store([1.0, 0.1], {"result": "live"}, ttl=1000)
+
+    now[0] += 100
+
+    assert cache.lookup([1.0, 0.0]) == {"result": "live"}
@@ -0,0 +1,64 @@
+import pytest
+import requests
+
+from rag_agent.retrievers import wos
+from rag_agent.retrievers.wos import WosRetriever
+
+
+def _response(status, headers=None, body=b"{}"):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = body
+    resp.url = wos.WOS_URL
+    return resp
+
+
+class _FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(WosRetriever._request.retry, "sleep", slept.append)
+    monkeypatch.setattr(wos, "_last_429", 0.0)
+    return slept
+
+
+@pytest.mark.parametrize("retry_after, expected", [("2", 2.0), ("600", 60.0)])
+def test_request_waits_for_retry_after_on_429(sleeps, retry_after, expected):
+    r = WosRetriever()
+    r._session = _FakeSession(_response(429, {"Retry-After": retry_after}), _response(200, body=b'{"hits": []}'))
+
+    assert r._request({}) == {"hits": []}
+    assert r._session.calls == 2
+    assert sleeps == [expected]
+
+
+def test_request_does_not_retry_other_4xx(sleeps):
+    r = WosRetriever()
+    r._session = _FakeSession(_response(404), _response(200))
+
+    with pytest.raises(requests.HTTPError):
+        r._request({})
+    assert r._session.calls == 1
+    assert sleeps == []
+
+
+def test_page_concurrency_drops_after_429_and_recovers(sleeps, monkeypatch):
+    assert wos._page_concurrency() == wos.PAGE_CONCURRENCY
+
+    r = WosRetriever()
+    r._session = _FakeSession(_response(429, {"Retry-After": "0"}), _response(200))
+    r._request({})
+    assert wos._page_concurrency() == 1
+
+    monkeypatch.setattr(wos, "_last_429", wos._last_429 - wos.THROTTLE_COOLDOWN)
+    assert wos._page_concurrency() == wos.PAGE_CONCURRENCY
@@ -9,35 +9,49 @@ class CitationFormatter:
             "apa7": self._apa7,
         }
 
+    # ===== Parsing (shared by both consumers) =====
+    @staticmethod
+    def _parse(r: Dict[str, Any]) -> Dict[str, Any]:
+        doi = r.get("doi")
+        return {
+            "citekey": r.get("citekey"),
+            "title": r.get("title"),
+            "doi": doi,
+            "url": f"https://doi.org/{doi}" if doi else None,
+            "authors": r.get("authors") or [],
+            "year": r.get("year"),
+            "venue": r.get("venue"),
+            "publisher": r.get("publisher"),
+            "volume": r.get("volume"),
+            "issue": r.get("issue"),
+            "pages": r.get("pages"),
+            "source": r.get("source"),
+        }
+
+    @classmethod
+    def parse_all(cls, resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [cls._parse(r) for r in resources]
+
     # ===== Structured =====
+    @classmethod
+    def to_structured(cls, resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return cls.parse_all(resources)
+
     @staticmethod
-    def to_structured(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        for r in resources:
-            doi = r.get("doi")
-            out.append(
-                {
-                    "citekey": r.get("citekey"),
-                    "title": r.get("title"),
-                    "doi": doi,
-                    "url": f"https://doi.org/{doi}" if doi else None,
-                    "authors": r.get("authors") or [],
-                    "year": r.get("year"),
-                    "venue": r.get("venue"),
-                    "publisher": r.get("publisher"),
-                    "volume": r.get("volume"),
-                    "issue": r.get("issue"),
-                    "pages": r.get("pages"),
-                    "source": r.get("source"),
-                }
-            )
-        return out
+    def to_structured_parsed(parsed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # shallow copies: callers may mutate the structured output independently
+        return [dict(p) for p in parsed]
 
     # ===== String formatting =====
     def format(self, resources: List[Dict], style: str = "raw") -> List[str]:
-        if style not in self._styles:
+        fmt = self._styles.get(style)
+        if fmt is None:
             raise ValueError(f"Unsupported citation style: {style}")
-        return [self._styles[style](r) for r in resources]
+        return [fmt(r) for r in resources]
+
+    def format_parsed(self, parsed: List[Dict[str, Any]], style: str = "raw") -> List[str]:
+        """Same as `format`, on records already normalised by `parse_all`."""
+        return self.format(parsed, style=style)
 
     @staticmethod
     def _raw(r: Dict) -> str:
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+EMBED_MODEL = "text-embedding-3-small"
+CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite3"))
+
+# texts per embeddings request: the API takes up to 2048 inputs but also caps
+# tokens per request, so stay well below that for abstract-sized texts
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "512"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))  # requests in flight
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+_LOCK = threading.Lock()
+_SQL_CHUNK = 500  # stay well below SQLite's host-parameter limit
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _connect(path: str) -> sqlite3.Connection:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings ("
+        " model TEXT NOT NULL, hash TEXT NOT NULL, vec BLOB NOT NULL,"
+        " PRIMARY KEY (model, hash))"
+    )
+    return conn
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model: str = EMBED_MODEL):
+    """Process-wide `OpenAIEmbeddings` client (created lazily, reused across requests)."""
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=model, chunk_size=EMBED_BATCH_SIZE, max_retries=2)
+
+
+def get_or_compute(
+    texts: Sequence[str],
+    model: str = EMBED_MODEL,
+    embed_fn: Optional[EmbedFn] = None,
+    path: str = CACHE_PATH,
+) -> np.ndarray:
+    """Return a float32 (len(texts), dim) matrix, embedding only cache misses.
+
+    Vectors are stored in SQLite keyed by ``(model, sha256(text))``; misses go
+    to the provider in `EMBED_BATCH_SIZE` batches sent concurrently and are
+    written back.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    hashes = [text_hash(t) for t in texts]
+    pending: Dict[str, str] = {}
+    for h, t in zip(hashes, texts):
+        pending.setdefault(h, t)
+
+    conn = _connect(path)
+    found: Dict[str, np.ndarray] = {}
+    uniq = list(pending)
+    with _LOCK:
+        for i in range(0, len(uniq), _SQL_CHUNK):
+            chunk = uniq[i : i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                (model, *chunk),
+            )
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32)
+
+    missing = [h for h in uniq if h not in found]
+    if missing:
+        fn = embed_fn or get_embeddings(model).embed_documents
+        vectors = _embed_batched(fn, [pending[h] for h in missing])
+        fresh = dict(zip(missing, vectors))
+        with _LOCK:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vec) VALUES (?, ?, ?)",
+                [(model, h, v.tobytes()) for h, v in fresh.items()],
+            )
+            conn.commit()
+        found.update(fresh)
+
+    return np.vstack([found[h] for h in hashes])
+
+
+def _embed_batched(fn: EmbedFn, texts: List[str]) -> np.ndarray:
+    """Embed `texts` into one preallocated float32 matrix, filled batch by batch."""
+    batches = [texts[i : i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    if len(batches) == 1:
+        return np.asarray(fn(batches[0]), dtype=np.float32)
+    out: Optional[np.ndarray] = None
+    with ThreadPoolExecutor(max_workers=min(EMBED_CONCURRENCY, len(batches))) as pool:
+        for i, vectors in zip(range(0, len(texts), EMBED_BATCH_SIZE), pool.map(fn, batches)):
+            if out is None:  # dim is only known once the first batch is back
+                out = np.empty((len(texts), len(vectors[0])), dtype=np.float32)
+            out[i : i + len(vectors)] = vectors
+    return out
+
+
+def embed_query(text: str, model: str = EMBED_MODEL, path: str = CACHE_PATH) -> np.ndarray:
+    """Embed a single query string as a float32 (1, dim) matrix (cached like documents)."""
+    return get_or_compute([text], model=model, path=path)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import Type, Any
+import os
+from functools import lru_cache
+from typing import Any, Optional, Type
 from langchain_openai import ChatOpenAI
 from langchain_ollama import ChatOllama
 from langchain_core.language_models.chat_models import BaseChatModel
 
 
 LOCAL_CFG = dict(
-    model="gpt-oss",
-    base_url="http://localhost:11434",
+    model=os.getenv("OLLAMA_CHAT_MODEL", "gpt-oss"),
+    base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
     streaming=False,
     temperature=0.1,
     keep_alive=-1,
@@ -18,15 +20,32 @@ LOCAL_CFG = dict(
 )
 
 
+@lru_cache(maxsize=1)
+def _openai_llm() -> BaseChatModel:
+    return ChatOpenAI(model="gpt-5", temperature=0.2)
+
+
+_LOCAL_LLM: Optional[BaseChatModel] = None
+
+
 def build_llm() -> BaseChatModel:
-    """Prefer local Ollama; fall back to OpenAI `gpt-5` if local is unavailable."""
+    """Prefer local Ollama; fall back to OpenAI `gpt-5` if local is unavailable.
+
+    A working local client (with its HTTP pool) is kept for the process; the
+    first call also loads the local model, so call it at startup to pre-warm.
+    The fallback is not sticky: while Ollama is down every call tries it again.
+    """
+    global _LOCAL_LLM
+    if _LOCAL_LLM is not None:
+        return _LOCAL_LLM
     try:
         llm = ChatOllama(**LOCAL_CFG)
         # smoke test – will raise if server/model not reachable
         _ = llm.invoke("ping")
-        return llm
     except Exception:
-        return ChatOpenAI(model="gpt-5", temperature=0.2)
+        return _openai_llm()
+    _LOCAL_LLM = llm
+    return llm
 
 
 def with_structured_output(llm: BaseChatModel, schema: Type[Any]) -> BaseChatModel:
@@ -35,5 +54,4 @@ def with_structured_output(llm: BaseChatModel, schema: Type[Any]) -> BaseChatMod
         return llm.with_structured_output(schema)
     except Exception:
         # Fallback to OpenAI which has first-class structured output
-        llm2 = ChatOpenAI(model="gpt-5", temperature=0.2)
-        return llm2.with_structured_output(schema)
\ No newline at end of file
+        return _openai_llm().with_structured_output(schema)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic.v1 import BaseModel, Field
 
@@ -29,9 +30,20 @@ HUMAN = (
 
 
 def generate_search_terms(topic: str, language: str, max_terms: int = 3) -> List[str]:
+    """LLM-suggested search queries for `topic`; repeated calls are served from memory."""
+    return list(_cached_terms(topic, language, max_terms))
+
+
+@lru_cache(maxsize=256)
+def _cached_terms(topic: str, language: str, max_terms: int) -> Tuple[str, ...]:
+    # a tuple, so callers can't mutate the cached value; failures are not cached
+    return tuple(_generate(topic, language, max_terms))
+
+
+def _generate(topic: str, language: str, max_terms: int) -> List[str]:
     llm = build_llm()
     parser = with_structured_output(llm, SearchTerms)
     prompt = ChatPromptTemplate.from_messages([("system", SYSTEM), ("human", HUMAN)])
     result: SearchTerms = (prompt | parser).invoke({"topic": topic, "language": language})
     terms = [t for t in (result.terms or []) if t and t.strip()]
-    return terms[: max_terms]
\ No newline at end of file
+    return terms[: max_terms]
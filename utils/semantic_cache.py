@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import os
+import pickle
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from .embed_cache import embed_query
+
+
+CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", os.path.join(".cache", "semantic_cache.pkl"))
+DEFAULT_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+DEFAULT_TTL = 3600  # seconds
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+LOOKUP_K = 4  # neighbours checked per lookup (skipping expired ones)
+# time-sensitive topics must always be answered fresh
+EXCLUDE_RE = re.compile(
+    os.getenv("SEMANTIC_CACHE_EXCLUDE", r"\b(today|latest|newest|recent(ly)?|current(ly)?|this (week|month|year))\b"),
+    re.IGNORECASE,
+)
+
+
+def is_cacheable(topic: str) -> bool:
+    return not EXCLUDE_RE.search(topic or "")
+
+
+class _Namespace:
+    """Vectors + entries of one namespace; the FAISS index is rebuilt from `vectors`."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+        self.index = faiss.IndexFlatIP(dim)
+
+    def rebuild(self) -> None:
+        self.index = faiss.IndexFlatIP(self.vectors.shape[1])
+        if len(self.vectors):
+            self.index.add(self.vectors)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"vectors": self.vectors, "entries": self.entries}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.vectors = state["vectors"]
+        self.entries = state["entries"]
+        self.rebuild()
+
+
+class SemanticCache:
+    """Similarity cache: returns a stored value when a query vector is close enough.
+
+    Entries live in per-namespace `IndexFlatIP` indexes over L2-normalised
+    vectors (cosine similarity) and are persisted to a pickle file on write.
+    At most `max_entries` are kept overall; the least recently used go first.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: int = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._spaces: Dict[str, _Namespace] = self._load()
+
+    def _load(self) -> Dict[str, _Namespace]:
+        try:
+            with open(self.path, "rb") as fh:
+                return pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return {}
+
+    def _save(self) -> None:
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"  # per process: concurrent writers never share it
+        with open(tmp, "wb") as fh:
+            pickle.dump(self._spaces, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _normalize(vec: np.ndarray) -> np.ndarray:
+        xq = np.array(vec, dtype=np.float32, ndmin=2)
+        faiss.normalize_L2(xq)
+        return xq
+
+    def lookup(
+        self, vec: np.ndarray, namespace: str = "", threshold: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached value of the nearest live entry at or above `threshold`
+        (defaults to the instance threshold)."""
+        threshold = self.threshold if threshold is None else threshold
+        xq = self._normalize(vec)
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is None or space.index.ntotal == 0 or space.vectors.shape[1] != xq.shape[1]:
+                return None
+            # a few neighbours: an expired nearest entry must not hide a live one behind it
+            D, I = space.index.search(xq, min(LOOKUP_K, space.index.ntotal))
+            now = time.time()
+            for score, i in zip(D[0], I[0]):
+                if i < 0 or score < threshold:
+                    break  # results are sorted by similarity
+                entry = space.entries[i]
+                if entry["expires_at"] > now:
+                    entry["last_used"] = now
+                    return entry["value"]
+            return None
+
+    def store(self, vec: np.ndarray, value: Dict[str, Any], namespace: str = "", ttl: Optional[int] = None) -> None:
+        xq = self._normalize(vec)
+        now = time.time()
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is None or space.vectors.shape[1] != xq.shape[1]:
+                space = self._spaces[namespace] = _Namespace(xq.shape[1])
+
+            space.vectors = np.vstack([space.vectors, xq])
+            space.entries.append({
+                "value": value,
+                "expires_at": now + (self.ttl if ttl is None else ttl),
+                "last_used": now,
+            })
+            space.index.add(xq)
+            self._evict(now)
+            self._save()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones beyond `max_entries`."""
+        live = [
+            (e.get("last_used", 0.0), name, i)
+            for name, space in self._spaces.items()
+            for i, e in enumerate(space.entries)
+            if e["expires_at"] > now
+        ]
+        live.sort(reverse=True)
+        keep: Dict[str, List[int]] = {name: [] for name in self._spaces}
+        for _, name, i in live[: self.max_entries]:
+            keep[name].append(i)
+
+        for name, idx in keep.items():
+            space = self._spaces[name]
+            if len(idx) == len(space.entries):
+                continue
+            idx.sort()
+            space.vectors = space.vectors[idx]
+            space.entries = [space.entries[i] for i in idx]
+            space.rebuild()
+
+
+_CACHES: Dict[str, SemanticCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def default_cache(path: Optional[str] = None) -> SemanticCache:
+    """Process-wide cache instance for `path` (default: `SEMANTIC_CACHE_PATH`)."""
+    path = path or CACHE_PATH
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = SemanticCache(path)
+        return _CACHES[path]
+
+
+def get(topic: str, namespace: str = "") -> Optional[Dict[str, Any]]:
+    """Look up a cached result for `topic` (embedded with the default model)."""
+    if not is_cacheable(topic):
+        return None
+    return default_cache().lookup(embed_query(topic), namespace)
+
+
+def put(topic: str, result: Dict[str, Any], namespace: str = "", ttl: int = DEFAULT_TTL) -> None:
+    if is_cacheable(topic):
+        default_cache().store(embed_query(topic), result, namespace, ttl=ttl)
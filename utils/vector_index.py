@@ -0,0 +1,182 @@
+"""FAISS helpers for top-k record selection.
+
+Kept free of LangChain/agent imports so unpickling work for spawned worker
+processes (see `process_pool`) pulls in only FAISS and NumPy from here. Spawn
+still re-runs the parent's ``__main__`` module (as ``__mp_main__``) in every
+worker, e.g. all of main.py's imports, so the pool costs a full app import per
+worker once and a pickled copy of the vectors per call: use it only for
+corpora of at least `POOL_MIN_RECORDS`.
+"""
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from .embed_cache import text_hash
+
+
+IVF_MIN_RECORDS = 2_500     # ~39 training points per centroid at nlist=64; flat below
+IVFPQ_MIN_RECORDS = 10_000  # PQ codebooks need a few thousand points to train well
+# below this a flat search is cheaper inline than shipping the vectors to a worker;
+# live requests (a few hundred records) never reach it, only bulk/offline corpora
+POOL_MIN_RECORDS = int(os.getenv("INDEX_POOL_MIN_RECORDS", "5000"))
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", str(os.cpu_count() or 1)))
+INDEX_DIR = os.getenv("FAISS_INDEX_DIR", os.path.join(".cache", "faiss"))
+# persisted indexes kept in INDEX_DIR; the least recently used beyond this are deleted
+INDEX_MAX_FILES = int(os.getenv("FAISS_INDEX_MAX_FILES", "200"))
+
+
+def build_index(xb: np.ndarray) -> faiss.Index:
+    """Inner-product index over L2-normalised vectors (i.e. cosine similarity).
+
+    Small corpora use an exact flat scan; larger ones an IVF index (IVF-PQ
+    once the corpus is big enough for PQ training to be meaningful).
+    """
+    n, d = xb.shape
+    if n < IVF_MIN_RECORDS:
+        index = faiss.IndexFlatIP(d)
+        index.add(xb)
+        return index
+
+    nlist = min(64, n // 4)
+    quantizer = faiss.IndexFlatIP(d)
+    if n >= IVFPQ_MIN_RECORDS and d % 16 == 0:
+        index = faiss.IndexIVFPQ(quantizer, d, nlist, 16, 8, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexIVFFlat(quantizer, d, nlist, faiss.METRIC_INNER_PRODUCT)
+    index.train(xb)
+    index.add(xb)
+    index.nprobe = min(8, nlist)
+    return index
+
+
+def corpus_key(texts: Sequence[str]) -> str:
+    """Stable id of an ordered corpus (row i of the index ↔ texts[i])."""
+    h = hashlib.sha256()
+    for t in texts:
+        h.update(text_hash(t).encode("ascii"))
+    return h.hexdigest()
+
+
+def index_path(key: str) -> str:
+    return os.path.join(INDEX_DIR, f"{key}.faiss")
+
+
+def load_index(path: str) -> Optional[faiss.Index]:
+    """Memory-map a previously persisted index (read-only), if there is one."""
+    try:
+        index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:  # missing, or pruned between the caller's check and now
+        return None
+    try:
+        os.utime(path)  # mtime doubles as "last used" for pruning
+    except OSError:
+        pass
+    return index
+
+
+def save_index(index: faiss.Index, path: str) -> None:
+    """Write via a temp file + atomic rename so readers never see a partial index."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    faiss.write_index(index, tmp)
+    os.replace(tmp, path)
+    prune_indexes(folder or ".")
+
+
+def prune_indexes(folder: str, keep: Optional[int] = None) -> None:
+    """Delete all but the `keep` (default `INDEX_MAX_FILES`) most recently used indexes."""
+    keep = INDEX_MAX_FILES if keep is None else keep
+    files = []
+    try:
+        for e in os.scandir(folder):
+            if e.name.endswith(".faiss"):
+                files.append((e.stat().st_mtime, e.path))
+    except OSError:  # folder or an entry vanished under a concurrent prune
+        return
+    if len(files) <= keep:
+        return
+    files.sort(reverse=True)
+    for _, path in files[keep:]:
+        try:
+            os.remove(path)
+        except OSError:  # already gone, or still mapped (Windows)
+            pass
+
+
+def gpu_available() -> bool:
+    """True when FAISS was built with GPU support and sees at least one device."""
+    return hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0
+
+
+_GPU_RES = None
+_GPU_LOCK = threading.Lock()  # StandardGpuResources must not be used concurrently
+
+
+def _gpu_search(index: faiss.Index, xq: np.ndarray, k: int):
+    global _GPU_RES
+    with _GPU_LOCK:
+        if _GPU_RES is None:
+            _GPU_RES = faiss.StandardGpuResources()
+        return faiss.index_cpu_to_gpu(_GPU_RES, 0, index).search(xq, k)
+
+
+def top_k_indices(
+    xb: Optional[np.ndarray],
+    query_vec: np.ndarray,
+    k: int,
+    path: Optional[str] = None,
+    use_gpu: bool = False,
+) -> List[int]:
+    """Cosine top-k row indices for `query_vec` (un-normalised).
+
+    With `path`, an index persisted there is reused (and `xb` may be None);
+    otherwise the index is built from `xb` and, if a path is given, saved.
+    `use_gpu` runs the search on GPU 0 when one is available (the index is
+    still built and persisted on the CPU).
+    """
+    xq = np.array(query_vec, dtype=np.float32, ndmin=2)
+    faiss.normalize_L2(xq)
+
+    index = load_index(path) if path else None
+    if index is None:
+        if xb is None:
+            raise FileNotFoundError(f"No persisted index at {path!r} and no vectors given")
+        xb = np.array(xb, dtype=np.float32, order="C")
+        faiss.normalize_L2(xb)
+        index = build_index(xb)
+        if path:
+            save_index(index, path)
+
+    k = min(k, index.ntotal)
+    _, I = _gpu_search(index, xq, k) if use_gpu and gpu_available() else index.search(xq, k)
+    return [int(i) for i in I[0] if i >= 0]
+
+
+def _init_worker() -> None:
+    # one OpenMP thread per worker: parallelism comes from the processes
+    faiss.omp_set_num_threads(1)
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """Lazily created pool for CPU-bound index work (spawned, so no fork-after-OpenMP)."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=INDEX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _POOL